@@ -5,16 +5,57 @@ This module sets up the training / testing dataset for training the model.
 import torch
 import os
 import json
-import re
+import numpy as np
 import pandas as pd
+from collections import Counter, OrderedDict, defaultdict
 from glob import glob
 from tqdm import tqdm
+from tabulate import tabulate
 from pathlib import Path
 from torch.utils.data import DataLoader
 from datasets import load_dataset
-from pddl.parser.problem import ProblemParser
-from pddl.core import Problem
-from ...utils.pddl_manipulation import get_manipulated_problem_list
+from ...utils.pddl_manipulation import (
+    STATE_ORDER, ManipulatedProblems, ProblemFragments, from_edit_script, get_manipulated_problems,
+    get_manipulation_rng, get_state_lists,
+)
+from ...utils.problem_store import open_dataset_stores, POSITIVE_FILE_NAME, ANCHOR_FILE_NAME
+from ...utils.problem_cache import ParsedProblemCache, PARSED_CACHE_DIR_NAME, parse_problem
+from ...utils.file_io import atomic_write_file
+from ..generate_dataset.convert_pddl import iter_dataset_records
+
+STRING_TABLE_FILE_NAME = "strings.json"
+STRING_TABLE_FORMAT = "sem2plan-string-table"
+STRING_TABLE_VERSION = 1
+
+
+def to_object_array(values: list) -> np.ndarray:
+    """1-D object array of `values`, e.g. strings kept as Python strings rather than fixed-width NumPy strings."""
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class LRUCache:
+    """Mapping of at most `maxsize` items, dropping the least recently used one first."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+
+    def get(self, key):
+        """Returns the item of `key` (now the most recently used), or None."""
+        if key not in self.items:
+            return None
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
 
 
 class TorchDataset(torch.utils.data.Dataset):
@@ -27,80 +68,206 @@ class TorchDataset(torch.utils.data.Dataset):
         - positive: corresponding correct PDDL problem (from `positive.pddl`)
         - negatives: 10 manipulated PDDL problems per entry
 
-    Each entry is created by slicing a list of 1000 manipulated problems into 100 groups.
+    Each entry is created by slicing a list of 1000 distinct manipulated problems into 100 groups,
+    so no two entries of a problem share a negative. With a `seed`, the list of each problem is
+    drawn from the problem's own random stream, keyed by (domain, problem id) (see
+    `get_manipulation_rng`), so it is the same in every run and process no matter the order
+    problems are built in.
+
+    In `lazy` mode no negative is drawn up front: an entry served draws its problem's list from the
+    problem's stream, the same negatives as a seeded eager dataset. An entry's negatives are only
+    distinct from those of the other entries of its problem as part of that list, so the first access
+    draws the whole list rather than the entry's 10 negatives. The lists of the last 64 problems
+    served are kept as edits (a few bytes per negative), an evicted list is drawn again identically,
+    and the rendered negatives of the last `cache_size` entries are kept.
+
+    The metadata is stored by column and built in one pass: the problem columns hold one row per
+    problem, and entry `k` is entry `k % num_entries` of problem `k // num_entries`.
 
     Attributes:
-        data (pd.DataFrame): Stores metadata including problem name, entry ID,
-                             and content of anchor and positive samples.
-        manipulated_problem_model_dict (dict): Maps unique keys to lists of 10 negative samples.
+        domains, problem_names, problem_ids, anchors, positives (np.ndarray): Problem columns (domain,
+                                     name, problem id, anchor and positive contents).
+        negatives (list): 10 negative samples of each entry, stored as edits of their positive
+                          (see `ManipulatedProblems`). None in lazy mode.
+        order (np.ndarray): Entry served at each index, permuted by `shuffle`.
+        stores (dict): Problem store of each domain directory (see `open_dataset_stores`).
+        negative_stats (dict): Number of negatives drawn, rejected (duplicates or copies of the
+                               positive) and repeated to fill up problems with too few distinct
+                               negatives, and number of such short problems, per domain (see
+                               `get_manipulated_problems`). In lazy mode, the negatives drawn so far.
     """
     
-    def __init__(self, dir_path, expand_size = False, estimate_batch_size = 32):
+    def __init__(self, dir_path, expand_size = False, estimate_batch_size = 32, parse_cache = None, records = None,
+                 seed = None, lazy = False, cache_size = 0, num_entries = 100):
         """
         Initializes the TorchDataset object by loading and preparing the dataset.
 
         Args:
-            dir_path (str): Root directory containing all problem subdirectories.
+            dir_path (str): Root directory containing the domain datasets (problem directories or packed shards).
             expand_size (bool, optional): Placeholder for future data expansion. Defaults to False.
-            estimate_batch_size (int, optional): Estimated number of manipulated problems to generate. Defaults to 32.
+            estimate_batch_size (int, optional): Unused, each problem gets `num_entries * 10` negatives. Defaults to 32.
+            parse_cache (str, optional): Directory of the `ParsedProblemCache` problems are loaded from.
+                Defaults to `dir_path/parsed_cache`, the cache the generation and conversion filled.
+            records (iterable, optional): (domain, problem_id, anchor, positive) records to build the dataset
+                from instead of reading `anchor.nl` and `positive.pddl` from the stores, e.g. the records
+                streamed by `iter_dataset_records` during the conversion. Defaults to None.
+            seed (int, optional): Root seed of the per-problem negative streams. Defaults to None, drawing
+                from the global `numpy.random` state (or, in lazy mode, from a random root seed).
+            lazy (bool, optional): Draw the negatives of an entry when it is served. Defaults to False.
+            cache_size (int, optional): Number of entries whose rendered negatives are kept in lazy mode.
+                Defaults to 0 (none).
+            num_entries (int, optional): Number of entries per problem. Defaults to 100.
         """
-        self.estimate_batch_size = estimate_batch_size # number of problems to make from a single problem file
+        self.estimate_batch_size = estimate_batch_size # unused, see `num_entries`
         self.expand_size = expand_size
+        self.lazy = lazy
+        self.seed = seed if seed is not None or not lazy else np.random.SeedSequence().entropy
+        
+        # retrieve problem ids of every domain
+        self.stores = open_dataset_stores(dir_path)
+        problem_keys = [(domain, problem_id) for domain, store in self.stores.items() for problem_id in store.problem_ids()]
+        if records is None:
+            records = ((domain, problem_id, *self.read_problem(domain, problem_id)) for domain, problem_id in problem_keys)
+        self.parse_cache = ParsedProblemCache(parse_cache or os.path.join(dir_path, PARSED_CACHE_DIR_NAME))
         
-        # retrieve problem filepaths
-        problem_filepaths = glob(os.path.join(dir_path, "*/p*/p*"), recursive=True)
-        self.data = pd.DataFrame(columns=["problem_name", "problem_entry", "query_content", "positive_content"])
+        # split each problem into 100 groups, each with 10 manipulated problems
+        self.num_entries = num_entries # number of data entries per problem
+        self.problems_per_entry = 10   # each data entry gets 10 problems
+        num_entries, problems_per_entry = self.num_entries, self.problems_per_entry
         
-        self.manipulated_problem_model_dict = dict() # key is f'{problem_name}_{problem_model}'
+        domains, problem_names, problem_ids, anchors, positives = [], [], [], [], [] # column buffers, one row per problem
+        self.negatives = None if lazy else [] # one item per entry, in entry order
+        self.negative_stats = defaultdict(Counter)
+        self.text_cache = LRUCache(cache_size)    # entry -> rendered negatives, lazy mode
+        self.fragment_cache = LRUCache(64)        # problem row -> ProblemFragments, lazy mode
+        self.negative_plans = LRUCache(64)        # problem row -> ManipulationPlan of its negatives, lazy mode
+        self.counted_problems = set()             # problem rows whose draw stats are recorded, lazy mode
         
         # iterate through each problem...
-        for problem_filepath in tqdm(problem_filepaths, desc="Setting up dataset"):
-
-            anchor_path = f"{problem_filepath}/anchor.nl"
-            positive_path = f"{problem_filepath}/positive.pddl"
-            
-            match = re.search(r"p\d+", os.path.basename(problem_filepath))  # Extracts "p01", "p123", etc.
-            if match:
-                problem_entry = match.group()
-            
-            with open(anchor_path, 'r') as f:
-                query_str = f.read()
+        for domain, problem_entry, query_str, problem_str in tqdm(records, total=len(problem_keys), desc="Setting up dataset"):
 
             # retrieve problem name (problem_name)
-            with open(positive_path, 'r') as f:
-                problem_str = f.read()
-            problem_model = ProblemParser()(problem_str)
-            problem_name = problem_model.name
-            query_content = query_str
-            positive_content = problem_str
-
-            # retrieve list of negative samples (1000) from a single problem set
-            manipulated_problem_list, _ = get_manipulated_problem_list(problem_model, self.estimate_batch_size, 4)
-            
-            assert len(manipulated_problem_list) == 1000, f"Expected 1000 problems per problem file, got {len(manipulated_problem_list)}"
-            
-            # split into 100 groups, each with 10 manipulated problems
-            num_entries = 100       # number of data entries
-            problems_per_entry = 10 # each data entry gets 10 problems
-            
-            for i in range(num_entries):
-                start_idx = i * problems_per_entry
-                end_idx = start_idx + problems_per_entry
-                
-                negative_samples = manipulated_problem_list[start_idx:end_idx] # get 10 problems
-            
-                self.manipulated_problem_model_dict[f"{problem_name}_{problem_entry}_{i}"] = negative_samples
+            problem_model = self.parse_cache.parse(problem_str)
+            domains.append(domain)
+            problem_names.append(problem_model.name)
+            problem_ids.append(problem_entry)
+            anchors.append(query_str)
+            positives.append(problem_str)
+
+            if self.lazy:
+                continue
+            elif self.seed is None:
+                # retrieve distinct negative samples (1000) from a single problem set, kept as edits of the problem
+                manipulated_problem_list = get_manipulated_problems(problem_model, num_entries * problems_per_entry, 4,
+                                                                    unique=True)
+            else:
+                # the same distinct negative samples from the problem's own stream
+                fragments = ProblemFragments(problem_model, *get_state_lists(problem_model))
+                manipulated_problem_list = self.draw_problem_negatives(domain, problem_entry, fragments)
+            self.record_negative_stats(domain, manipulated_problem_list.draw_stats)
+
+            assert len(manipulated_problem_list) == num_entries * problems_per_entry, \
+                f"Expected {num_entries * problems_per_entry} problems per problem file, got {len(manipulated_problem_list)}"
+
+            # get 10 problems per entry (views, built on access)
+            self.negatives.extend(self.get_entry_slice(manipulated_problem_list, i) for i in range(num_entries))
+
+        # materialize the columns once
+        self.domains = to_object_array(domains)
+        self.problem_names = to_object_array(problem_names)
+        self.problem_ids = to_object_array(problem_ids)
+        self.anchors = to_object_array(anchors)
+        self.positives = to_object_array(positives)
+        self.order = np.arange(len(self.positives) * num_entries)
+
+        if not self.lazy:
+            self.print_negative_stats()
+
+    def draw_problem_negatives(self, domain, problem_id, fragments):
+        """Draws the distinct negatives of all entries of a problem from the problem's stream (see `get_manipulation_rng`)."""
+        rng = get_manipulation_rng(self.seed, domain, problem_id)
+        return get_manipulated_problems(fragments.problem, self.num_entries * self.problems_per_entry, 4, rng,
+                                        True, fragments)
 
-                self.data.loc[len(self.data)] = {
-                    "problem_name": problem_name,
-                    "problem_entry": f"{problem_entry}_{i}",
-                    "query_content": query_content,         # anchor
-                    "positive_content": positive_content    # positive sample
-                }
+    def get_entry_slice(self, negatives, entry_idx):
+        """The negatives of the `entry_idx`-th entry of a problem, out of all negatives of the problem."""
+        return negatives[entry_idx * self.problems_per_entry:(entry_idx + 1) * self.problems_per_entry]
+
+    def get_fragments(self, problem_idx):
+        """Fragments of the positive of a problem row, parsed through the parse cache."""
+        fragments = self.fragment_cache.get(problem_idx)
+        if fragments is None:
+            problem = self.parse_cache.parse(self.positives[problem_idx])
+            fragments = ProblemFragments(problem, *get_state_lists(problem))
+            self.fragment_cache.put(problem_idx, fragments)
+        return fragments
+
+    def get_entry_negatives(self, entry):
+        """The `ManipulatedProblems` of an entry; in lazy mode, the problem's negatives are drawn on first use."""
+        if not self.lazy:
+            return self.negatives[entry]
+        problem_idx, entry_idx = divmod(entry, self.num_entries)
+        fragments = self.get_fragments(problem_idx)
+        plan = self.negative_plans.get(problem_idx)
+        if plan is None:
+            domain = self.domains[problem_idx]
+            negatives = self.draw_problem_negatives(domain, self.problem_ids[problem_idx], fragments)
+            if problem_idx not in self.counted_problems:  # a redrawn list is the same one
+                self.record_negative_stats(domain, negatives.draw_stats)
+                self.counted_problems.add(problem_idx)
+            plan = negatives.plan
+            self.negative_plans.put(problem_idx, plan)
+        negatives = ManipulatedProblems(fragments.problem, plan, fragments.init_state, fragments.goal_state, fragments)
+        return self.get_entry_slice(negatives, entry_idx)
+
+    def get_lazy_negatives(self, entry):
+        """Rendered negatives of an entry in lazy mode, drawn on a miss of the text cache."""
+        texts = self.text_cache.get(entry)
+        if texts is None:
+            texts = self.get_entry_negatives(entry).get_texts()
+            self.text_cache.put(entry, texts)
+        return texts
+
+    def read_problem(self, domain, problem_id):
+        """
+        Reads a raw problem by domain directory name and problem id (e.g. "blocksworld", "p01").
+
+        Returns:
+            tuple: (anchor, positive) contents of the problem.
+        """
+        store = self.stores[domain]
+        return store.read(problem_id, ANCHOR_FILE_NAME), store.read(problem_id, POSITIVE_FILE_NAME)
+
+    def record_negative_stats(self, domain, draw_stats):
+        """Adds the `draw_stats` of a batch of negatives to the counts of its domain."""
+        self.negative_stats[domain].update(draw_stats)
+        self.negative_stats[domain]["short_problems"] += int(draw_stats["filled"] > 0)
+
+    def print_negative_stats(self):
+        """Prints the rejection rate of the negatives of each domain."""
+        rows = []
+        for domain, stats in sorted(self.negative_stats.items()):
+            rejected = stats["duplicates"] + stats["positive_matches"]
+            rows.append([domain, stats["drawn"], stats["duplicates"], stats["positive_matches"],
+                         f"{rejected / max(stats['drawn'], 1):.2%}", stats["filled"], stats["short_problems"]])
+        print("\nNegative rejections")
+        print(tabulate(rows, headers=["domain", "drawn", "duplicates", "positive matches", "rejection rate",
+                                      "filled", "short problems"]))
+
+    @property
+    def data(self):
+        """The entries as a DataFrame (problem name, entry ID, anchor and positive), in the served order."""
+        problem_idx, entry_idx = np.divmod(self.order, self.num_entries)
+        return pd.DataFrame({
+            "problem_name": self.problem_names[problem_idx],
+            "problem_entry": [f"{problem_id}_{i}" for problem_id, i in zip(self.problem_ids[problem_idx], entry_idx)],
+            "query_content": self.anchors[problem_idx],
+            "positive_content": self.positives[problem_idx],
+        })
 
     def __len__(self):
         """Returns the number of entries in the dataset."""
-        return len(self.data)
+        return len(self.order)
         
     def __getitem__(self, idx):
         """
@@ -116,28 +283,37 @@ class TorchDataset(torch.utils.data.Dataset):
                 'negatives': List[str]  # 10 manipulated PDDL problems
             }
         """
-        row = self.data.iloc[idx]
-        
-        anchor = row["query_content"]
-        positive = row["positive_content"]
-        
-        # retrieve negative samples
-        problem_key = f"{row['problem_name']}_{row['problem_entry']}"
-        negatives = self.manipulated_problem_model_dict.get(problem_key, [])
-        
-        negative_strings = [Problem.__str__(neg) for neg in negatives]
+        problem_idx = self.get_problem_index(idx)
         
         output_dict = {
-            "anchor": anchor,
-            "positive": positive,
-            "negatives": negative_strings
+            "anchor": self.anchors[problem_idx],
+            "positive": self.positives[problem_idx],
+            "negatives": self.get_negatives(idx)
         }
         
         return output_dict
+
+    def get_problem_index(self, idx):
+        """Row in the problem columns of the entry at the given index."""
+        return int(self.order[idx]) // self.num_entries
+
+    def get_negatives(self, idx):
+        """The 10 negatives of the entry at the given index, as text."""
+        entry = int(self.order[idx])
+        
+        # rendered from the positive's pre-formatted fragments, same text as Problem.__str__
+        if self.lazy:
+            return self.get_lazy_negatives(entry)
+        return self.negatives[entry].get_texts()
+
+    def get_negative_edit_scripts(self, idx):
+        """The 10 negatives of the entry at the given index, as edit scripts of the positive (see `to_edit_script`)."""
+        negatives = self.get_entry_negatives(int(self.order[idx]))
+        return [negatives.get_edit_script(index) for index in range(len(negatives))]
     
     def shuffle(self):
         """Shuffles the dataset entries randomly in place."""
-        self.data = self.data.sample(frac=1).reset_index(drop=True)
+        np.random.shuffle(self.order)
 
 
 
@@ -153,12 +329,102 @@ class TorchTestDataset(torch.utils.data.Dataset):
 
         
 
+def build_string_table(dataset):
+    """
+    Interns the anchors and positives of a TorchDataset, so each distinct text is stored once.
+
+    Returns:
+        tuple: (strings, anchor_ids, positive_ids) where the ids of problem row `i` index `strings`.
+    """
+    string_ids = {}
+    anchor_ids = [string_ids.setdefault(text, len(string_ids)) for text in dataset.anchors]
+    positive_ids = [string_ids.setdefault(text, len(string_ids)) for text in dataset.positives]
+    return list(string_ids), anchor_ids, positive_ids
+
+
+def write_string_table(path, strings):
+    """Writes a string table with its format version and the state order of the edit scripts referencing it."""
+    table = {"format": STRING_TABLE_FORMAT, "version": STRING_TABLE_VERSION, "state_order": STATE_ORDER,
+             "strings": strings}
+    atomic_write_file(path, json.dumps(table))
+
+
+def read_string_table(path, delta_negatives=False):
+    """
+    Reads the strings of a string table written by `write_string_table`.
+
+    Tables of an older release (a bare JSON list) are read as well, unless
+    `delta_negatives`: their edit scripts may index atoms in another order.
+
+    Raises:
+        ValueError: the table has another format, version or state order.
+    """
+    with open(path, "r") as f:
+        table = json.load(f)
+
+    if isinstance(table, list):
+        if delta_negatives:
+            raise ValueError(f"{path} has no state order, its edit scripts cannot be rendered; regenerate the dataset")
+        return table
+
+    header = {key: table.get(key) for key in ("format", "version", "state_order")}
+    expected = {"format": STRING_TABLE_FORMAT, "version": STRING_TABLE_VERSION, "state_order": STATE_ORDER}
+    if header != expected:
+        raise ValueError(f"{path} has {header}, expected {expected}; regenerate the dataset")
+    return table["strings"]
+
+
+def resolve_string_references(dataset, data_dir, fragment_cache_size=256):
+    """
+    Resolves the `anchor_id` / `positive_id` references of a normalized dataset (see
+    `generate_dataset`) to the `anchor` / `positive` texts of its string table. The
+    texts are looked up when rows are accessed, so each one is held in memory once.
+    Delta-encoded negatives (`negative_edits`) are rendered at the same time from
+    the fragments of their positive, kept for the last `fragment_cache_size` positives.
+    Datasets without a string table are returned as they are.
+
+    Raises:
+        ValueError: the string table does not match this version (see `read_string_table`).
+    """
+    string_table_path = os.path.join(data_dir, STRING_TABLE_FILE_NAME)
+    if not os.path.exists(string_table_path):
+        return dataset
+
+    strings = read_string_table(string_table_path, delta_negatives="negative_edits" in dataset.column_names)
+    fragment_cache = LRUCache(fragment_cache_size)
+
+    def get_fragments(positive_id):
+        fragments = fragment_cache.get(positive_id)
+        if fragments is None:
+            problem = parse_problem(strings[positive_id])
+            fragments = ProblemFragments(problem, *get_state_lists(problem))
+            fragment_cache.put(positive_id, fragments)
+        return fragments
+
+    def expand_negatives(positive_id, edit_scripts):
+        fragments = get_fragments(positive_id)
+        return [fragments.render(*from_edit_script(script)) for script in edit_scripts]
+
+    def resolve(batch):
+        if "negative_edits" in batch:
+            negatives = [expand_negatives(*row) for row in zip(batch["positive_id"], batch["negative_edits"])]
+        else:
+            negatives = batch["negatives"]
+        return {
+            "anchor": [strings[i] for i in batch["anchor_id"]],
+            "positive": [strings[i] for i in batch["positive_id"]],
+            "negatives": negatives,
+        }
+
+    return dataset.with_transform(resolve)
+
+
 def create_train_dataset():
     """loads in training dataset"""
     data_dir = "data/02_intermediate_dataset/training"
     data_paths = glob(os.path.join(data_dir, "*jsonl"))
     train_dataset = load_dataset("json", data_files=data_paths, split="train")
-    return train_dataset
+    return resolve_string_references(train_dataset, data_dir)
     
 
 def create_test_dataset():
@@ -170,23 +436,57 @@ def create_test_dataset():
 
     test_dataset = test_dataset.shuffle(seed=42)
 
-    return test_dataset
+    return resolve_string_references(test_dataset, data_dir)
     
     
     
-def generate_dataset(data_path, save_path, total_num_examples = 1.0e5, chunksize=5000):
+def generate_dataset(data_path, save_path, total_num_examples = 1.0e5, chunksize=5000, stream=False, num_workers=None,
+                     seed=None, normalized=False, delta_negatives=False):
     """
     Generates training dataset by sampling from a TorchDataset object and saving it 
     to JSONL files by certain chunk sizes.
+
+    With `stream`, the problems are converted to natural language on the fly
+    (on `num_workers` processes) and their records go straight into the
+    TorchDataset, so no `anchor.nl` has to be written and read back.
+
+    With a `seed`, the negatives of every entry are reproducible (see `TorchDataset`).
+
+    With `normalized`, each distinct anchor and positive is written once, to the string
+    table `strings.json` (see `write_string_table`), and the entries of the JSONL files reference them
+    by index: {"anchor_id": int, "positive_id": int, "negatives": [...]}.
+    `create_train_dataset` / `create_test_dataset` resolve the references.
+
+    With `delta_negatives` (which implies `normalized`), the negatives of an entry are
+    stored as edit scripts of its positive instead of texts (see `to_edit_script`):
+    {"anchor_id": int, "positive_id": int, "negative_edits": [[[op, init_idx, goal_idx], ...], ...]}.
+    They are rendered back when the rows are accessed.
     """
     
     data_dir = data_path
-    train_dataset = TorchDataset(dir_path=data_dir, expand_size=False, estimate_batch_size=1000)
+    records = iter_dataset_records(data_dir, num_workers=num_workers) if stream else None
+    train_dataset = TorchDataset(dir_path=data_dir, expand_size=False, estimate_batch_size=1000, records=records,
+                                 seed=seed)
     train_dataset_length = len(train_dataset)
         
     save_dir = save_path
     Path(save_dir).mkdir(parents=True, exist_ok=True)
     
+    if normalized or delta_negatives:
+        strings, anchor_ids, positive_ids = build_string_table(train_dataset)
+        write_string_table(os.path.join(save_dir, STRING_TABLE_FILE_NAME), strings)
+
+        def get_entry(i):
+            problem_idx = train_dataset.get_problem_index(i)
+            entry = {"anchor_id": anchor_ids[problem_idx], "positive_id": positive_ids[problem_idx]}
+            if delta_negatives:
+                entry["negative_edits"] = train_dataset.get_negative_edit_scripts(i)
+            else:
+                entry["negatives"] = train_dataset.get_negatives(i)
+            return entry
+    else:
+        get_entry = train_dataset.__getitem__
+    
     file_id = 0
     num_count = 0
     output_list = []
@@ -194,7 +494,7 @@ def generate_dataset(data_path, save_path, total_num_examples = 1.0e5, chunksize
     
     while num_count < train_dataset_length:
         for i in range(len(train_dataset)):
-            output_list.append(json.dumps(train_dataset[i]))
+            output_list.append(json.dumps(get_entry(i)))
             num_count += 1
             pbar.update(1)
             if len(output_list) == chunksize:
@@ -0,0 +1,118 @@
+"""
+This module checkpoints problem generation runs so they can be resumed.
+
+A run keeps two files in its dataset directory:
+    - generation_manifest.json: written once when the run starts. It holds the
+      domain, the generation arguments, the state of `random` and the entropy
+      of the native generators' seeds at the start of the run. At the end of the
+      run, the number of problems in the dataset is added, with whether it fell
+      short of `max_iterations` (the jobs ran out).
+    - generation_progress.jsonl: one line appended per accepted problem with its
+      iteration number, the index of the job it came from and its hash.
+
+Jobs are drawn deterministically from the recorded RNG state, so a resumed run
+replays the job sequence up to the last committed job and carries on exactly
+where the killed run stopped.
+"""
+
+import json
+import os
+import random
+import numpy
+from ...utils.file_io import atomic_write_file
+
+MANIFEST_FILE_NAME = "generation_manifest.json"
+PROGRESS_FILE_NAME = "generation_progress.jsonl"
+
+# arguments that may change between a run and its resumption
+RUNTIME_ARGS = {"max_iterations", "num_workers", "max_in_flight", "generator_timeout", "generator_retries", "timing_report",
+                "storage", "parse_cache"}
+
+
+def get_run_args(args) -> dict:
+    return {k: v for k, v in sorted(vars(args).items()) if k not in RUNTIME_ARGS}
+
+
+class GenerationCheckpoint:
+    """
+    Loads or starts the checkpoint of a generation run in `dataset_dir`.
+
+    Args:
+        start_iteration (int): first `pNN` number of a new run (problems already in the directory).
+
+    Attributes:
+        iteration (int): next `pNN` number to assign.
+        job_index (int): index of the next job to run.
+        accepted_hashes (list): hashes of the problems accepted by this run.
+        entropy (int): entropy of the `SeedSequence` of the native generators.
+        resumed (bool): whether an existing checkpoint was loaded.
+    """
+
+    def __init__(self, dataset_dir: str, domain_name: str, args, start_iteration: int = 0):
+        self.manifest_path = os.path.join(dataset_dir, MANIFEST_FILE_NAME)
+        self.progress_path = os.path.join(dataset_dir, PROGRESS_FILE_NAME)
+        self.iteration = start_iteration
+        self.job_index = 0
+        self.accepted_hashes = []
+        self.resumed = False
+
+        run_args = json.loads(json.dumps(get_run_args(args)))
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                manifest = self.manifest = json.load(f)
+            self.resumed = manifest["domain"] == domain_name and manifest["args"] == run_args
+            if not self.resumed:
+                print(f"{self.manifest_path} belongs to a run with other arguments, starting a new run.")
+
+        if self.resumed:
+            version, state, gauss = manifest["random_state"]
+            random.setstate((version, tuple(state), gauss))
+            self.entropy = manifest["entropy"]
+            self.iteration = manifest["start_iteration"]
+            self._load_progress()
+        else:
+            seed = getattr(args, "seed", None)
+            self.entropy = numpy.random.SeedSequence(seed if seed is not None and seed >= 0 else None).entropy
+            manifest = self.manifest = {
+                "domain": domain_name,
+                "args": run_args,
+                "random_state": random.getstate(),
+                "entropy": self.entropy,
+                "start_iteration": start_iteration,
+            }
+            atomic_write_file(self.manifest_path, json.dumps(manifest))
+            if os.path.exists(self.progress_path):
+                os.remove(self.progress_path)
+
+    def _load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return
+
+        valid_size = 0
+        with open(self.progress_path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # last line was cut by the kill
+                record = json.loads(line)
+                self.iteration = record["iteration"] + 1
+                self.job_index = record["job_index"] + 1
+                self.accepted_hashes.append(record["hash"])
+                valid_size += len(line.encode())
+
+        # drop a cut last line so new records start on a fresh line
+        os.truncate(self.progress_path, valid_size)
+
+    def record_result(self, num_problems: int, max_iterations: int):
+        """Records in the manifest the number of problems the run left in the dataset."""
+        self.manifest.update(num_problems=num_problems, max_iterations=max_iterations,
+                             short=num_problems < max_iterations)
+        atomic_write_file(self.manifest_path, json.dumps(self.manifest))
+
+    def commit(self, iteration: int, job_index: int, problem_hash: str):
+        """Records an accepted problem once its files are written."""
+        with open(self.progress_path, "a") as f:
+            f.write(json.dumps({"iteration": iteration, "job_index": job_index, "hash": problem_hash}) + "\n")
+        self.iteration = iteration + 1
+        self.job_index = job_index + 1
+        self.accepted_hashes.append(problem_hash)
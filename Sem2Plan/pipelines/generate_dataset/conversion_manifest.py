@@ -0,0 +1,65 @@
+"""
+This module keeps track of which anchors are up to date, so conversions only
+regenerate the `anchor.nl` files whose inputs or converter changed.
+
+The manifest (`conversion_manifest.json` in the dataset directory) records the
+converter, its version and the content hash of the `positive.pddl` each anchor
+was rendered from. A different converter version invalidates every anchor.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from ...utils.file_io import atomic_write_file
+
+CONVERSION_MANIFEST_FILE_NAME = "conversion_manifest.json"
+
+
+def get_converter_version(*objects) -> str:
+    """
+    Fingerprint of the source code of the given classes, functions or modules,
+    so any change to the converter logic gives a new version.
+    """
+    md5 = hashlib.md5()
+    for obj in objects:
+        md5.update(inspect.getsource(obj).encode())
+    return md5.hexdigest()
+
+
+class ConversionManifest:
+    """
+    Loads the conversion manifest of `dataset_dir`. Entries recorded by another
+    converter or another version of it are dropped.
+
+    Attributes:
+        problems (dict): problem id -> hash of the `positive.pddl` its anchor was rendered from.
+    """
+
+    def __init__(self, dataset_dir: str, converter: str, version: str):
+        self.manifest_path = os.path.join(dataset_dir, CONVERSION_MANIFEST_FILE_NAME)
+        self.converter = converter
+        self.version = version
+        self.problems = {}
+        self._current = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+            if manifest["converter"] == converter and manifest["version"] == version:
+                self.problems = manifest["problems"]
+
+    def is_up_to_date(self, problem_id: str, input_hash: str) -> bool:
+        return self.problems.get(problem_id) == input_hash
+
+    def record(self, problem_id: str, input_hash: str):
+        """Marks the anchor of a problem as rendered from the input with `input_hash`."""
+        self._current[problem_id] = input_hash
+
+    def save(self):
+        """Writes the problems recorded by this run, problems that failed or disappeared are left out."""
+        atomic_write_file(self.manifest_path, json.dumps({
+            "converter": self.converter,
+            "version": self.version,
+            "problems": self._current,
+        }))
@@ -8,46 +8,118 @@ Training should be separated for each training:
         - Hard: single predicate from either init and goal removed/added
 """
 
-import glob, os
-from pddl import parse_problem
+import os, itertools, heapq
+from collections import defaultdict
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from tqdm import tqdm
 from pddl.logic.predicates import Predicate
-from abc import ABC, abstractmethod
-
-
-def retrieve_problem_files(dataset_dir: str) -> list[str]:
-    os.makedirs(dataset_dir, exist_ok=True)
-    problem_path = os.path.join(dataset_dir, 'problems/p*')
-    problem_files = glob.glob(problem_path)
-    return problem_files
-
-
-def write_anchor_files(problem_file: str, description: str):
-    
-    anchor_dir = problem_file + "/anchor.nl"
-
-    nl_file = os.path.splitext(anchor_dir)[0] + ".nl"
-    with open(nl_file, 'w') as f:
-        f.write(description)
-
-
-def count_types(task):
-    count = {}
-
-    for obj in task.objects:
-        if obj.type_tag not in count.keys():
-            count[obj.type_tag] = 0
-        count[obj.type_tag] += 1
-
-    return count
-
-
-def get_goals(task):
-    if hasattr(task.goal, 'operands') and len(task.goal.operands) > 0:
-        goals = task.goal.operands
-    else:
-        goals = [getattr(task, 'goals', [])]  # Fallback to task.goals or empty list
-
-    return goals
+from abc import ABC
+from ...utils.timing import StageTimer, timed_call
+from ...utils.problem_store import open_problem_store, list_dataset_dirs, POSITIVE_FILE_NAME, ANCHOR_FILE_NAME
+from ...utils import pddl_reader
+from ...utils.pddl_hashing import get_content_hash, get_goal_atoms
+from ...utils.problem_cache import ParsedProblemCache, get_default_cache_dir, parse_problem_cached
+from . import nl_templates
+from .nl_templates import NLTemplate, Text, Atoms
+from .conversion_manifest import ConversionManifest, get_converter_version
+
+
+def retrieve_problem_files(store) -> list[str]:
+    return store.problem_ids()
+
+
+def write_anchor_files(store, problem_id: str, description: str):
+    store.write(problem_id, ANCHOR_FILE_NAME, description)
+
+
+class PredicateIndex:
+    """
+    Buckets the init and goal atoms of a problem by predicate name, in a single
+    pass over each, so converters look up the atoms they describe instead of
+    scanning `task.init` once per predicate.
+
+    Atoms keep their position in `task.init` (or in the goal), so asking for
+    several predicates at once yields them interleaved in the original order.
+
+    Attributes:
+        goals (list): goal atoms, the operands of an `And` goal or the goal itself.
+        type_counts (dict): number of objects per type tag (computed on first use).
+        objects_by_type (dict): objects of each type tag, in `task.objects` order (computed on first use).
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.init = self._bucket(task.init)
+        self.goals = get_goal_atoms(task)
+        self.goal = self._bucket(self.goals)
+
+    @cached_property
+    def objects_by_type(self) -> dict:
+        objects_by_type = defaultdict(list)
+        for obj in self.task.objects:
+            objects_by_type[obj.type_tag].append(obj)
+        return objects_by_type
+
+    @cached_property
+    def type_counts(self) -> dict:
+        return {type_tag: len(objs) for type_tag, objs in self.objects_by_type.items()}
+
+    @staticmethod
+    def _bucket(atoms) -> dict:
+        buckets = defaultdict(list)
+        for position, atom in enumerate(atoms):
+            if type(atom) is Predicate:
+                buckets[atom.name.lower()].append((position, atom))  # PDDL names are case-insensitive
+        return buckets
+
+    @staticmethod
+    def _lookup(buckets: dict, names) -> list:
+        if len(names) == 1:
+            return [atom for _, atom in buckets.get(names[0].lower(), [])]
+        entries = heapq.merge(*(buckets.get(name.lower(), []) for name in names), key=lambda entry: entry[0])
+        return [atom for _, atom in entries]
+
+    def init_atoms(self, *names) -> list:
+        """Init atoms of the given predicates, in `task.init` order."""
+        return self._lookup(self.init, names)
+
+    def goal_atoms(self, *names) -> list:
+        """Goal atoms of the given predicates, in goal order."""
+        return self._lookup(self.goal, names)
+
+
+def convert_problem(domain, problem_str: str, cache: ParsedProblemCache = None):
+    """
+    Parses a problem (through `cache` if given) and describes it with
+    `domain.describe`. Executed inside the worker processes, so an error is
+    returned rather than raised and only fails its own problem.
+
+    Returns:
+    - (description, error, parse_seconds, render_seconds) where either
+      `description` or `error` is None.
+    """
+    try:
+        task, parse_seconds = timed_call(parse_problem_cached, problem_str, cache)
+        description, render_seconds = timed_call(domain.describe, task)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", 0.0, 0.0
+    return description, None, parse_seconds, render_seconds
+
+
+def iter_conversions(domain, problem_strs: list, num_workers: int, cache: ParsedProblemCache = None):
+    """
+    Yields the result of `convert_problem` for each problem, in order, converted
+    on `num_workers` processes (in this process if `num_workers` is 1).
+    """
+    with ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else nullcontext() as executor:
+        if executor is None:
+            yield from map(convert_problem, itertools.repeat(domain), problem_strs, itertools.repeat(cache))
+        else:
+            chunksize = max(1, min(32, len(problem_strs) // (4 * num_workers)))
+            yield from executor.map(convert_problem, itertools.repeat(domain), problem_strs, itertools.repeat(cache),
+                                    chunksize=chunksize)
 
 
 
@@ -55,599 +127,464 @@ def get_goals(task):
 """ TRAINING DOMAINS """
 class Domain(ABC):
 
-    @abstractmethod
-    def convert_pddl_to_nl(self, dataset_dir: str):
+    def convert_pddl_to_nl(self, dataset_dir: str, timing_report: str = None, num_workers: int = None,
+                           force: bool = False, parse_cache: str = None):
         """
-        Abstract method to convert PDDL problem files into 
-        natural language components.
+        Converts the `positive.pddl` of every problem of `dataset_dir` into its
+        natural language `anchor.nl`, in the dataset's problem store (one
+        directory per problem or packed shards, see `open_problem_store`).
+
+        Problems are parsed and described on `num_workers` processes (defaults
+        to the number of cores), in problem order, while this process writes
+        each `anchor.nl` atomically as its result comes in. A problem that
+        fails is reported and skipped, the others are still converted.
+
+        Conversion is incremental: `dataset_dir/conversion_manifest.json`
+        records the hash of the `positive.pddl` each anchor was rendered from
+        and the converter version (see `converter_version`). Only problems
+        whose input or converter changed are converted again, unless `force`.
+
+        Problems are parsed through the `ParsedProblemCache` in `parse_cache`
+        (by default the one the generation filled, next to `dataset_dir`), so
+        problems parsed before are loaded instead of parsed again.
+
+        The parse, render and write stages are timed per problem. A summary
+        table is printed at the end and written as JSON to `timing_report`
+        (by default `dataset_dir/conversion_timing.json`).
+
+        Returns:
+        - failures: dict mapping the id of each problem that failed to its error.
         """
+        name = type(self).__name__
+        num_workers = num_workers or os.cpu_count()
+        timer = StageTimer(name)
+        failures = {}
+        os.makedirs(dataset_dir, exist_ok=True)
+        manifest = ConversionManifest(dataset_dir, name, self.converter_version())
+        cache = ParsedProblemCache(parse_cache or get_default_cache_dir(dataset_dir))
+
+        with open_problem_store(dataset_dir) as store:
+            problem_ids, problem_strs, input_hashes = [], [], []
+            for problem_id in retrieve_problem_files(store):
+                problem_str = store.read(problem_id, POSITIVE_FILE_NAME)
+                input_hash = get_content_hash(problem_str)
+                if not force and manifest.is_up_to_date(problem_id, input_hash) and store.contains(problem_id, ANCHOR_FILE_NAME):
+                    manifest.record(problem_id, input_hash)
+                    timer.count("up to date")
+                    continue
+                problem_ids.append(problem_id)
+                problem_strs.append(problem_str)
+                input_hashes.append(input_hash)
+
+            results = iter_conversions(self, problem_strs, num_workers, cache)
+            for problem_id, input_hash, (description, error, parse_seconds, render_seconds) in tqdm(
+                    zip(problem_ids, input_hashes, results), total=len(problem_ids), desc=f"Converting {name}"):
+                if error is not None:
+                    failures[problem_id] = error
+                    timer.count("failed")
+                    continue
+
+                timer.record("parse", parse_seconds)
+                timer.record("render", render_seconds)
+                with timer.time("write"):
+                    write_anchor_files(store, problem_id, description)
+                manifest.record(problem_id, input_hash)
+                timer.count("converted")
+
+        manifest.save()
+        timer.print_summary()
+        timer.write_report(timing_report or os.path.join(dataset_dir, "conversion_timing.json"))
+
+        for problem_id, error in failures.items():
+            print(f"Failed to convert {problem_id}: {error}")
+        return failures
+
+    def iter_records(self, dataset_dir: str, num_workers: int = None, parse_cache: str = None):
+        """
+        Streaming counterpart of `convert_pddl_to_nl`: converts every problem of
+        `dataset_dir` the same way, but yields a record per problem instead of
+        writing `anchor.nl` files, so the records can go straight into a
+        dataset builder (see `TorchDataset`).
+
+        Yields:
+        - (domain, problem_id, anchor, positive) where `domain` is the name of
+          the dataset directory (e.g. "blocksworld"). Problems that fail are
+          reported and skipped.
+        """
+        domain = os.path.basename(os.path.normpath(dataset_dir))
+        num_workers = num_workers or os.cpu_count()
+        cache = ParsedProblemCache(parse_cache or get_default_cache_dir(dataset_dir))
 
+        with open_problem_store(dataset_dir) as store:
+            problem_ids = retrieve_problem_files(store)
+            problem_strs = [store.read(problem_id, POSITIVE_FILE_NAME) for problem_id in problem_ids]
 
-class Blocksworld(Domain):
-
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-
-            object_count = len(task.objects)
-            description += f"You have {object_count} blocks. \n"
-            for atom in task.init:
-                if "on" == atom.name:
-                    description += f"{atom.terms[0].name} is on top of {atom.terms[1].name}. \n"
-            for atom in task.init:
-                if "on-table" == atom.name:
-                    description += f"{atom.terms[0].name} is on the table. \n"
-            for atom in task.init:
-                if "clear" == atom.name:
-                    description += f"{atom.terms[0].name} is clear. \n"
-            for atom in task.init:
-                if "arm-empty" == atom.name:
-                    description += f"Your arm is empty. \n" 
-            description += f"Your goal is to move the blocks. \n"
+            results = iter_conversions(self, problem_strs, num_workers, cache)
+            for problem_id, problem_str, (description, error, _, _) in zip(problem_ids, problem_strs, results):
+                if error is not None:
+                    print(f"Failed to convert {problem_id}: {error}")
+                    continue
+                yield domain, problem_id, description, problem_str
 
-            goals = get_goals(task)
-            for goal in goals:
-                description += f"{goal.terms[0].name} should be on top of {goal.terms[1].name}. \n"     
+    template: NLTemplate = None  # sections of the description, see `nl_templates`
 
-            write_anchor_files(problem_file, description)
+    def context(self, task, index: PredicateIndex) -> dict:
+        """
+        Values used by the `Text` sections of the domain's template, such as
+        object counts or grids.
+        """
+        return {}
 
+    def describe(self, task) -> str:
+        """
+        Converts a parsed PDDL problem into its natural language description.
+        """
+        index = PredicateIndex(task)
+        return self.template.render(index, self.context(task, index))
 
-class Barman(Domain):
-    
-    def convert_pddl_to_nl(self, dataset_dir: str):
+    def converter_version(self) -> str:
+        """
+        Version of the rendering logic: a fingerprint of the source of this
+        converter, of `Domain.describe`, `PredicateIndex`, the template engine
+        and of the code building the problems they read (`pddl_reader`, `get_goal_atoms`).
+        """
+        return get_converter_version(type(self), Domain.describe, PredicateIndex, nl_templates,
+                                     pddl_reader, get_goal_atoms)
 
-        problem_files = retrieve_problem_files(dataset_dir)
 
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            count = count_types(task)
+class Blocksworld(Domain):
 
-            description += f"You have {count['shaker']} shaker with {count['level']} levels, {count['shot']} shot glasses, {count['dispenser']} dispensers for {count['ingredient']} ingredients. \n"
-            description += "The shaker and shot glasses are clean, empty, and on the table. Your left and right hands are empty. \n"
-            cocktails = {obj.name: [0,0] for obj in task.objects if obj.type_tag == "cocktail"}
+    template = NLTemplate([
+        Text("You have {object_count} blocks. \n"),
+        Atoms({"on": "{0} is on top of {1}. \n"}),
+        Atoms({"on-table": "{0} is on the table. \n"}),
+        Atoms({"clear": "{0} is clear. \n"}),
+        Atoms({"arm-empty": "Your arm is empty. \n"}),
+        Text("Your goal is to move the blocks. \n"),
+        Atoms({"*": "{0} should be on top of {1}. \n"}, source="goal"),
+    ])
 
-            for atom in task.init:
-                if "cocktail-part1" in atom.name:
-                    cocktails[atom.terms[0].name][0] = atom.terms[1]
-                if "cocktail-part2" in atom.name:
-                    cocktails[atom.terms[0].name][1] = atom.terms[1]
+    def context(self, task, index):
+        return {"object_count": len(task.objects)}
 
-            for cocktail in cocktails.keys():
-                description += f"The first ingredient of {cocktail} is {cocktails[cocktail][0]}. "
-                description += f"The second ingredient of {cocktail} is {cocktails[cocktail][1]}. \n"
 
-            goals = get_goals(task)
-            description += f"Your goal is to make {len(goals)} cocktails. \n"
-            for goal in goals:
-                description += f"{goal.terms[0].name} contains {goal.terms[1].name}. "
+class Barman(Domain):
 
-            write_anchor_files(problem_file, description)
+    template = NLTemplate([
+        Text("You have {count[shaker]} shaker with {count[level]} levels, {count[shot]} shot glasses, "
+             "{count[dispenser]} dispensers for {count[ingredient]} ingredients. \n"),
+        Text("The shaker and shot glasses are clean, empty, and on the table. Your left and right hands are empty. \n"),
+        Text("{cocktails}"),
+        Text("Your goal is to make {num_goals} cocktails. \n"),
+        Atoms({"*": "{0} contains {1}. "}, source="goal"),
+    ])
+
+    def context(self, task, index):
+        cocktails = {obj.name: [0,0] for obj in index.objects_by_type["cocktail"]}
+
+        for atom in index.init_atoms("cocktail-part1"):
+            cocktails[atom.terms[0].name][0] = atom.terms[1]
+        for atom in index.init_atoms("cocktail-part2"):
+            cocktails[atom.terms[0].name][1] = atom.terms[1]
+
+        return {
+            "count": index.type_counts,
+            "cocktails": "".join(
+                f"The first ingredient of {cocktail} is {first}. The second ingredient of {cocktail} is {second}. \n"
+                for cocktail, (first, second) in cocktails.items()
+            ),
+            "num_goals": len(index.goals),
+        }
         
 
 class Floortile(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
 
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-
-            row = 1
-            column = 0
-            robots = 0
-            colors = []
-
-            for obj in task.objects:
-                if obj.type_tag == "robot":
-                    robots += 1
-                elif obj.type_tag == "color":
-                    colors.append(obj.name)
-                elif obj.type_tag == "tile":
-                    row = max(int(obj.name.split('_')[1].split('-')[0]) + 1, row)
-                    column = max(int(obj.name.split('-')[1]), column)
-
-            description += f"You have {row} rows and {column} columns of unpainted floor tiles. \n"
-
-            tiles = []
-            for obj in task.objects:
-                if obj.type_tag == "tile":
-                    tiles.append(obj)
-
-            tiles.sort()
-            for tile in tiles:
-                description += tile.name + " "
-
-                if int(tile.name.split('-')[1]) == column:
-                        description += "\n"
-
-            description += f"You have {robots} robot"
-            description += 's. \n' if robots > 1 else '. \n'
-            description += f"Each robot can paint in color "
-            for color in colors[:-1]:
-                description += color + ' or '
-            description += colors[-1] + '. \n'
-
-            for atom in task.init:
-                if type(atom) is Predicate and atom.name == "robot-has":
-                    description += f"{atom.terms[0].name} start with the color {atom.terms[1].name}. \n"
-
-            for atom in task.init:
-                if type(atom) is Predicate and atom.name == "robot-at":
-                    description += f"{atom.terms[0].name} is at {atom.terms[1].name}. \n"
-
-            description += f"Your goal is to paint the grid in the following pattern: \n"
-            for goal in task.goal.operands[:-1]:
-                description += f"{goal.terms[0].name} is {goal.terms[1].name}; "
-            description += f"{task.goal.operands[-1].terms[0].name} is {task.goal.operands[-1].terms[1].name}. \n"
-
-            write_anchor_files(problem_file, description)
+    template = NLTemplate([
+        Text("You have {row} rows and {column} columns of unpainted floor tiles. \n"),
+        Text("{tile_grid}"),
+        Text("You have {robots} robot{robots_end}"),
+        Text("Each robot can paint in color {colors}. \n"),
+        Atoms({"robot-has": "{0} start with the color {1}. \n"}),
+        Atoms({"robot-at": "{0} is at {1}. \n"}),
+        Text("Your goal is to paint the grid in the following pattern: \n"),
+        Atoms({"*": "{0} is {1}"}, source="goal", separator="; ", suffix=". \n"),
+    ])
+
+    def context(self, task, index):
+        row = 1
+        column = 0
+        robots = len(index.objects_by_type["robot"])
+        colors = [obj.name for obj in index.objects_by_type["color"]]
+
+        for obj in index.objects_by_type["tile"]:
+            row = max(int(obj.name.split('_')[1].split('-')[0]) + 1, row)
+            column = max(int(obj.name.split('-')[1]), column)
+
+        tiles = sorted(index.objects_by_type["tile"])
+        tile_grid = "".join(
+            tile.name + " " + ("\n" if int(tile.name.split('-')[1]) == column else "") for tile in tiles
+        )
+
+        return {
+            "row": row,
+            "column": column,
+            "tile_grid": tile_grid,
+            "robots": robots,
+            "robots_end": 's. \n' if robots > 1 else '. \n',
+            "colors": " or ".join(colors),
+        }
 
 
 class Grippers(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            count = count_types(task)
 
-            description += f"You control {count['robot']} robots, each robot has a left gripper and a right gripper. \n"
-            description += f"There are {count['room']} rooms and {count['object']} balls. \n"
+    template = NLTemplate([
+        Text("You control {count[robot]} robots, each robot has a left gripper and a right gripper. \n"),
+        Text("There are {count[room]} rooms and {count[object]} balls. \n"),
+        Atoms({"at-robby": "{0} is in {1}. "}),
+        Text("\n"),
+        Atoms({"at": "{0} is in {1}. "}),
+        Text("\nThe robots' grippers are free. \n"),
+        Text("Your goal is to transport the balls to their destinations. \n"),
+        Atoms({"*": "{0} should be in {1}. \n"}, source="goal"),
+    ])
 
-            robot_loc = {}
-            object_loc = {}
-            for atom in task.init:
-                if "at-robby" == atom.name:
-                    robot_loc[atom.terms[0].name] = atom.terms[1].name
-                if "at" == atom.name:
-                    object_loc[atom.terms[0].name] = atom.terms[1].name
-
-            for k, v in robot_loc.items():
-                description += f"{k} is in {v}. "
-            description += "\n"
-
-            for k, v in object_loc.items():
-                description += f"{k} is in {v}. "
-            description += "\nThe robots' grippers are free. \n"
-            description += "Your goal is to transport the balls to their destinations. \n"
-            
-            goals = get_goals(task)
-            for goal in goals:
-                description += f"{goal.terms[0].name} should be in {goal.terms[1].name}. \n"   
-
-            write_anchor_files(problem_file, description)
+    def context(self, task, index):
+        return {"count": index.type_counts}
 
 
 class Storage(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-
-            count = count_types(task)
-            count['depotarea'] = 0
-            count['containerarea'] = 0
-            depot_names = []
-            container_names = []
-
-            for obj in task.objects:
-                if "depot48-" in obj.name:
-                    count['depotarea'] += 1
-                    depot_names.append(obj.name)
-                if "container-" in obj.name:
-                    count['containerarea'] += 1
-                    container_names.append(obj.name)
-            
-            description += f"You have {count['depotarea']} depot storeareas, {count['containerarea']} container storeareas, {count['hoist']} hoists, {count['crate']} crates, 1 container0, 1 depot48, 1 loadarea. \n"
-            description += f"Depot storeareas are: "
-
-            for depot_name in depot_names:
-                description += f"{depot_name} "
-            description += f"\nContainer storeareas are: "
-            for container_name in container_names:
-                description += f"{container_name} "
-            description += f"\n"
-            description += f"Here is a map of depot storeareas: \n"
-            description += f"\n"    
-
-            if count['depotarea']/2 < 2:
-                row = 1
-                col = count['depotarea']
-            else:
-                row = 2
-                col = int(count['depotarea']/2)
-            for r in range(1, row+1):
-                for c in range(1, col+1):
-                    description += f"depot48-{r}-{c} "
-                description += f"\n"
-            description += f"\n"
-            description += f"According to the map, adjacent depot storeareas are connected. \n"
-            description += f"All depot storeareas are in depot48. \n"
-
-            for atom in task.init:
-                if "on" == atom.name:
-                    description += f"{atom.terms[0].name} is on {atom.terms[1].name}. \n"
-            description += f"All crates and container storeareas are in container0. \n"
-            description += f"All container storeareas are connected to loadarea. \n"
-            for atom in task.init:
-                if "connected" == atom.name and "depot" in atom.terms[0].name and "loadarea" in atom.terms[1].name:
-                    description += f"{atom.terms[0].name} and {atom.terms[1].name} are connected. \n"
-            clear_depot = []
-            hoist_loc = {}
-            for atom in task.init:
-                if "clear" == atom.name:
-                    clear_depot.append(atom.terms[0].name)
-                if "at" == atom.name and "hoist" in atom.terms[0].name:
-                    hoist_loc[atom.terms[0].name] = atom.terms[1].name
-            for item in clear_depot:
-                description += f"{item} "
-            if clear_depot:
-                description += f"are clear. \n"
-            for k,v in hoist_loc.items():
-                description += f"{k} is in {v}\n"
-            description += f"All hoists are available. \n"
-            description += f"Your goal is to move all crates to depot48."            
-
-            write_anchor_files(problem_file, description)  
-
 
-class Termes(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            stacks = []
+    template = NLTemplate([
+        Text("You have {count[depotarea]} depot storeareas, {count[containerarea]} container storeareas, "
+             "{count[hoist]} hoists, {count[crate]} crates, 1 container0, 1 depot48, 1 loadarea. \n"),
+        Text("Depot storeareas are: {depot_names}\nContainer storeareas are: {container_names}\n"),
+        Text("Here is a map of depot storeareas: \n\n{depot_map}\n"),
+        Text("According to the map, adjacent depot storeareas are connected. \n"),
+        Text("All depot storeareas are in depot48. \n"),
+        Atoms({"on": "{0} is on {1}. \n"}),
+        Text("All crates and container storeareas are in container0. \n"),
+        Text("All container storeareas are connected to loadarea. \n"),
+        Atoms({"connected": "{0} and {1} are connected. \n"},
+              where=lambda atom: "depot" in atom.terms[0].name and "loadarea" in atom.terms[1].name),
+        Atoms({"clear": "{0} "}, suffix="are clear. \n"),
+        Atoms({"at": "{0} is in {1}\n"}, where=lambda atom: "hoist" in atom.terms[0].name),
+        Text("All hoists are available. \n"),
+        Text("Your goal is to move all crates to depot48."),
+    ])
+
+    def context(self, task, index):
+        count = dict(index.type_counts)
+        depot_names = [obj.name for obj in task.objects if "depot48-" in obj.name]
+        container_names = [obj.name for obj in task.objects if "container-" in obj.name]
+        count['depotarea'] = len(depot_names)
+        count['containerarea'] = len(container_names)
+
+        if count['depotarea']/2 < 2:
             row = 1
-            column = 0
-            numb = 0
-            for obj in task.objects:
-                if obj.type_tag == "numb":
-                    numb += 1
-                elif obj.type_tag == "position":
-                    row = max(int(obj.name.split('-')[1]) + 1, row)
-                    column = max(int(obj.name.split('-')[2]) + 1, column)
-
-            description += f"The robot is on a grid with {row} rows and {column} columns. \n"
+            col = count['depotarea']
+        else:
+            row = 2
+            col = int(count['depotarea']/2)
+        depot_map = "".join(
+            "".join(f"depot48-{r}-{c} " for c in range(1, col+1)) + "\n" for r in range(1, row+1)
+        )
+
+        return {
+            "count": count,
+            "depot_names": "".join(f"{depot_name} " for depot_name in depot_names),
+            "container_names": "".join(f"{container_name} " for container_name in container_names),
+            "depot_map": depot_map,
+        }
 
-            positions = []
-            for obj in task.objects:
-                if obj.type_tag == "position":
-                    positions.append(obj)
 
-            positions.sort()
-            for obj in positions:
-                description += obj.name + " "
-                if int(obj.name.split('-')[2]) == column - 1:
-                    description += "\n"
-
-            for atom in task.init:
-                if type(atom) is Predicate and atom.name == "at":
-                    description += f"The robot is at {atom.terms[0].name}. \n"
-                if type(atom) is Predicate and atom.name == "IS-DEPOT":
-                    description += f"The depot for new blocks is at {atom.terms[0].name}. \n"
-
-            description += f"The maximum height of blocks is {numb - 1}. \n"
-            description += f"Your goal is to build blocks so that "
-
-            for goal in task.goal.operands:
+class Termes(Domain):
 
-                if type(goal) is Predicate and goal.name == "height" and int(goal.terms[1].name[-1]) > 0:
+    template = NLTemplate([
+        Text("The robot is on a grid with {row} rows and {column} columns. \n"),
+        Text("{position_grid}"),
+        Atoms({"at": "The robot is at {0}. \n", "IS-DEPOT": "The depot for new blocks is at {0}. \n"}),
+        Text("The maximum height of blocks is {max_height}. \n"),
+        Text("Your goal is to build blocks so that "),
+        Atoms({"height": "the height at {0} is {1}"}, source="goal",
+              where=lambda goal: int(goal.terms[1].name[-1]) > 0,
+              fields=lambda goal: (goal.terms[0].name, goal.terms[1].name[-1]),
+              separator=", ", suffix=". \n"),
+        Text("You cannot have an unplaced block at the end."),
+    ])
+
+    def context(self, task, index):
+        row = 1
+        column = 0
+        numb = len(index.objects_by_type["numb"])
+        for obj in index.objects_by_type["position"]:
+            row = max(int(obj.name.split('-')[1]) + 1, row)
+            column = max(int(obj.name.split('-')[2]) + 1, column)
+
+        positions = sorted(index.objects_by_type["position"])
+        position_grid = "".join(
+            obj.name + " " + ("\n" if int(obj.name.split('-')[2]) == column - 1 else "") for obj in positions
+        )
+
+        return {"row": row, "column": column, "position_grid": position_grid, "max_height": numb - 1}
 
-                    stacks.append((goal.terms[1].name[-1], goal.terms[0].name))
-            for stack in stacks[:-1]:
-                description += f"the height at {stack[1]} is {stack[0]}, "
-            description += f"the height at {stacks[-1][1]} is {stacks[-1][0]}. \n"
-            description += f"You cannot have an unplaced block at the end."
 
-            write_anchor_files(problem_file, description)
+class Logistics(Domain):
 
+    template = NLTemplate([
+        Text("You have {airplanes} airplanes, {trucks} trucks, {cities} cities, {locations} locations, and {packages} packages. \n"),
+        Atoms({"in-city": "Location {0} is in city {1}. \n"}),
+        Atoms({"at": "Truck {0} is at location {1}. \n"}, where=lambda atom: atom.terms[0].name.startswith("t")),
+        Atoms({"at": "Package {0} is at location {1}. \n"}, where=lambda atom: atom.terms[0].name.startswith("p")),
+        Atoms({"at": "Airplane {0} is at location {1}. \n"}, where=lambda atom: atom.terms[0].name.startswith("a")),
+        Text("\nYour goal is for: \n"),
+        Atoms({"at": "Package {0} to be at location {1}. \n"}, source="goal"),
+    ])
+
+    def context(self, task, index):
+        count = {"airplanes": 0, "trucks": 0, "cities": 0, "locations": 0, "packages": 0}
+        
+        for i in task.objects:
+            if i.name.startswith("a"):
+                count["airplanes"] += 1
+            elif i.name.startswith("t"):
+                count["trucks"] += 1
+            elif i.name.startswith("c"):
+                count["cities"] += 1
+            elif i.name.startswith("l"):
+                count["locations"] += 1
+            elif i.name.startswith("p"):
+                count["packages"] += 1
+
+        return count
 
-class Logistics(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            airplanes, trucks, cities, locs, pkgs = [], [], [], [], []
-            
-            for i in task.objects:
-                if i.name.startswith("a"):
-                    airplanes.append(i)
-                elif i.name.startswith("t"):
-                    trucks.append(i)
-                elif i.name.startswith("c"):
-                    cities.append(i)
-                elif i.name.startswith("l"):
-                    locs.append(i)
-                elif i.name.startswith("p"):
-                    pkgs.append(i)
-            
-            description += f"You have {len(airplanes)} airplanes, {len(trucks)} trucks, {len(cities)} cities, {len(locs)} locations, and {len(pkgs)} packages. \n"
-            
-            truck_description = ""
-            airplane_description = ""
-            package_description = ""
-
-            for atom in task.init:
-                if type(atom) is Predicate and atom.name == "in-city":
-                    description += f"Location {atom.terms[0].name} is in city {atom.terms[1].name}. \n"
-                
-                if type(atom) is Predicate and atom.name == "at":
-                    if atom.terms[0].name.startswith("t"):
-                        truck_description += f"Truck {atom.terms[0].name} is at location {atom.terms[1]}. \n"
-                    elif atom.terms[0].name.startswith("a"):
-                        airplane_description += f"Airplane {atom.terms[0].name} is at location {atom.terms[1]}. \n"
-                    elif atom.terms[0].name.startswith("p"):
-                        package_description += f"Package {atom.terms[0].name} is at location {atom.terms[1]}. \n"
-                        
-            description += truck_description + package_description + airplane_description
-            description += "\nYour goal is for: \n"
-            
-            for atom in task.goal.operands:
-                if type(atom) is Predicate and atom.name == "at":
-                    description += f"Package {atom.terms[0].name} to be at location {atom.terms[1].name}. \n"
-                    
-            write_anchor_files(problem_file, description)
-
-            
+        
 class Rovers(Domain):
-    """This function is heavily inefficient. I was too lazy to switch things around :)"""
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            
-            count = count_types(task)
-            count['Camera'] , count['Rover'], count['Waypoint'], count['Objective'] = 0, 0, 0, 0
-            camera_names, rover_names, waypoint_names, objective_names = [], [], [], []
-
-            for obj in task.objects:
-                if "Camera" in obj.type_tag:
-                    count['Camera'] += 1
-                    camera_names.append(obj.name)
-                if "Rover" in obj.type_tag:
-                    count['Rover'] += 1
-                    rover_names.append(obj.name)
-                if "Waypoint" in obj.type_tag:
-                    count['Waypoint'] += 1
-                    waypoint_names.append(obj.name)
-                if "Objective" in obj.type_tag:
-                    count['Objective'] += 1
-                    objective_names.append(obj.name)
-                    
-            description += f"You have {count['Camera']} cameras, {count['Rover']} rovers, {count['Waypoint']} waypoints, and {count['Objective']} objectives. \n"
-            description += f"You also have a general, 2 modes of high and low resolution, and 2 rover stores. \n"
-            description += f"Inititally, the general channel is free and you have the following: \n"
-            
-            for atom in task.init:
-                if "visible" == atom.name:
-                    description += f"Waypoint {atom.terms[0].name} is visible to waypoint {atom.terms[1].name}. \n"
-            
-            for atom in task.init:
-                if "at_soil_sample" == atom.name:
-                    description += f"Soil sample is at {atom.terms[0].name}. \n"
-                elif "at_rock_sample" == atom.name:
-                    description += f"Rock sample is at {atom.terms[0].name}. \n"
-                elif "at_lander" == atom.name:
-                    description += f"The general is at the lander at {atom.terms[1].name}. \n"
-
-            for atom in task.init:
-                if "at" == atom.name:
-                    description += f"Rover {atom.terms[0].name} is at {atom.terms[1].name}. \n"
-                    
-            for atom in task.init:
-                if "available" == atom.name:
-                    description += f"Rover {atom.terms[0].name} is available. \n"
-                if "store_of" == atom.name:
-                    description += f"{atom.terms[0].name} is the store of {atom.terms[1].name}. \n"
-                if "empty" == atom.name:
-                    description += f"{atom.terms[0].name} is empty. \n"
-                
-            for atom in task.init:
-                if "equipped_for_rock_analysis" == atom.name:
-                    description += f"Rover {atom.terms[0].name} is equipped for rock analysis. \n"
-                elif "equipped_for_soil_analysis" == atom.name:
-                    description += f"Rover {atom.terms[0].name} is equipped for soil analysis. \n"
-                elif "equipped_for_imaging" == atom.name:
-                    description += f"Rover {atom.terms[0].name} is equipped for imaging. \n"
-                    
-            for atom in task.init:
-                if "can_traverse" == atom.name:
-                    description += f"Rover {atom.terms[0].name} can traverse from {atom.terms[1].name} to {atom.terms[2].name}. \n"
-                    
-            for atom in task.init:
-                if "on_board" == atom.name:
-                    description += f"Camera {atom.terms[0].name} is on board with rover {atom.terms[1].name}. \n"
-                if "calibration_target" == atom.name:
-                    description += f"Camera {atom.terms[0].name}'s calibration target is objective {atom.terms[1].name}. \n"
-                if "supports" == atom.name:
-                    description += f"Camera {atom.terms[0].name} supports {atom.terms[1].name}. \n"
-                    
-            for atom in task.init:
-                if "visible_from" == atom.name:
-                    description += f"Objective {atom.terms[0].name} is visible from {atom.terms[1].name}. \n"
-            
-            description += "\nYour goal is the following: \n"
-            
-            goals = get_goals(task)
-            if len(goals) > 1:
-                for goal in goals:
-                    if goal.name == "communicated_rock_data":
-                        description += f"Communicated rock data should be at {goal.terms[0].name}. \n"
-                    elif goal.name == "communicated_soil_data":
-                        description += f"Communicated soil data should be at {goal.terms[0].name}. \n"
-                    elif goal.name == "communicated_image_data":
-                        description += f"Communicated image data should be at {goal.terms[0].name} with {goal.terms[1].name} resolution. \n"
-            else:
-                if task.goal.name == "communicated_rock_data":
-                    description += f"Communicated rock data should be at {goal.terms[0].name}. \n"
-                elif task.goal.name == "communicated_soil_data":
-                    description += f"Communicated soil data should be at {goal.terms[0].name}. \n"
-                elif task.goal.name == "communicated_image_data":
-                    description += f"Communicated image data should be at {goal.terms[0].name} with {goal.terms[1].name} resolution. \n"
-                
-            write_anchor_files(problem_file, description)
+
+    template = NLTemplate([
+        Text("You have {Camera} cameras, {Rover} rovers, {Waypoint} waypoints, and {Objective} objectives. \n"),
+        Text("You also have a general, 2 modes of high and low resolution, and 2 rover stores. \n"),
+        Text("Inititally, the general channel is free and you have the following: \n"),
+        Atoms({"visible": "Waypoint {0} is visible to waypoint {1}. \n"}),
+        Atoms({
+            "at_soil_sample": "Soil sample is at {0}. \n",
+            "at_rock_sample": "Rock sample is at {0}. \n",
+            "at_lander": "The general is at the lander at {1}. \n",
+        }),
+        Atoms({"at": "Rover {0} is at {1}. \n"}),
+        Atoms({
+            "available": "Rover {0} is available. \n",
+            "store_of": "{0} is the store of {1}. \n",
+            "empty": "{0} is empty. \n",
+        }),
+        Atoms({
+            "equipped_for_rock_analysis": "Rover {0} is equipped for rock analysis. \n",
+            "equipped_for_soil_analysis": "Rover {0} is equipped for soil analysis. \n",
+            "equipped_for_imaging": "Rover {0} is equipped for imaging. \n",
+        }),
+        Atoms({"can_traverse": "Rover {0} can traverse from {1} to {2}. \n"}),
+        Atoms({
+            "on_board": "Camera {0} is on board with rover {1}. \n",
+            "calibration_target": "Camera {0}'s calibration target is objective {1}. \n",
+            "supports": "Camera {0} supports {1}. \n",
+        }),
+        Atoms({"visible_from": "Objective {0} is visible from {1}. \n"}),
+        Text("\nYour goal is the following: \n"),
+        Atoms({
+            "communicated_rock_data": "Communicated rock data should be at {0}. \n",
+            "communicated_soil_data": "Communicated soil data should be at {0}. \n",
+            "communicated_image_data": "Communicated image data should be at {0} with {1} resolution. \n",
+        }, source="goal"),
+    ])
+
+    def context(self, task, index):
+        count = {'Camera': 0, 'Rover': 0, 'Waypoint': 0, 'Objective': 0}
+
+        for type_tag, num_objects in index.type_counts.items():
+            for type_name in count:
+                if type_name in type_tag:
+                    count[type_name] += num_objects
+
+        return count
 
 
 """ TESTING DOMAINS """
 class Hiking(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            
-            count = count_types(task)
-            count['car'] , count['couple'], count['person'], count['place'], count['tent'] = 0, 0, 0, 0, 0
-
-            for obj in task.objects:
-                if "car" in obj.type_tag:
-                    count['car'] += 1
-                if "couple" in obj.type_tag:
-                    count['couple'] += 1
-                if "person" in obj.type_tag:
-                    count['person'] += 1
-                if "place" in obj.type_tag:
-                    count['place'] += 1
-                if "tent" in obj.type_tag:
-                    count['tent'] += 1
-                    
-            description += f"You have {count['car']} cars, {count['couple']} couples, and thus {count['person']} people ({count['person']//2} guys and {count['person']//2} girls), {count['place']} places, and {count['tent']} tents. \n"
-            description += f"Inititally, you have the following: \n"
-            
-            at_car_desc = ""
-            at_person_desc = ""
-            at_tent_desc = ""
-            down_desc = ""
-            up_desc = ""
-            next_desc = ""
-            partners_desc = ""
-            walked_desc = ""
-            
-            for atom in task.init:
-                if "at_car" == atom.name:
-                    at_car_desc += f"Car {atom.terms[0].name} is at place {atom.terms[1].name}. \n"
-                elif "at_person" == atom.name:
-                    at_person_desc += f"Person {atom.terms[0].name} is at place {atom.terms[1].name}. \n"
-                elif "at_tent" == atom.name:
-                    at_tent_desc += f"Tent {atom.terms[0].name} is at place {atom.terms[1].name}. \n"
-                elif "down" == atom.name:
-                    down_desc += f"Tent {atom.terms[0].name} is down. \n"
-                elif "up" == atom.name:
-                    up_desc += f"Tent {atom.terms[0].name} is up. \n"
-                elif "next" == atom.name:
-                    next_desc += f"Place {atom.terms[0].name} is next to place {atom.terms[1].name}. \n"
-                elif "partners" == atom.name:
-                    partners_desc += f"Couple {atom.terms[0].name} consists of partners {atom.terms[1].name} and {atom.terms[2].name}. \n"
-                elif "walked" == atom.name:
-                    walked_desc += f"Couple {atom.terms[0].name} walked to place {atom.terms[1].name}. \n"
-            
-            description += at_car_desc + at_person_desc + at_tent_desc + down_desc + up_desc + next_desc + partners_desc + walked_desc
-            description += "\nThe goal is the following: \n"
-            
-            goals = get_goals(task)
-            if len(goals) > 1:
-                for goal in goals:
-                    if goal.name == "walked":
-                        description += f"Couple {goal.terms[0].name} walked to place {goal.terms[1].name}. \n"
-            else:
-                if goals[0] == "walked":
-                    description += f"Couple {goal.terms[0].name} walked to place {goal.terms[1].name}. \n"
-                
-            write_anchor_files(problem_file, description)
-                    
+
+    template = NLTemplate([
+        Text("You have {car} cars, {couple} couples, and thus {person} people ({pairs} guys and {pairs} girls), "
+             "{place} places, and {tent} tents. \n"),
+        Text("Inititally, you have the following: \n"),
+        Atoms({"at_car": "Car {0} is at place {1}. \n"}),
+        Atoms({"at_person": "Person {0} is at place {1}. \n"}),
+        Atoms({"at_tent": "Tent {0} is at place {1}. \n"}),
+        Atoms({"down": "Tent {0} is down. \n"}),
+        Atoms({"up": "Tent {0} is up. \n"}),
+        Atoms({"next": "Place {0} is next to place {1}. \n"}),
+        Atoms({"partners": "Couple {0} consists of partners {1} and {2}. \n"}),
+        Atoms({"walked": "Couple {0} walked to place {1}. \n"}),
+        Text("\nThe goal is the following: \n"),
+        Atoms({"walked": "Couple {0} walked to place {1}. \n"}, source="goal"),
+    ])
+
+    def context(self, task, index):
+        count = {'car': 0, 'couple': 0, 'person': 0, 'place': 0, 'tent': 0}
+
+        for type_tag, num_objects in index.type_counts.items():
+            for type_name in count:
+                if type_name in type_tag:
+                    count[type_name] += num_objects
+
+        count['pairs'] = count['person'] // 2
+        return count
 
 
 class MiniGrid(Domain):
-    def convert_pddl_to_nl(self, dataset_dir: str):
-
-        problem_files = retrieve_problem_files(dataset_dir)
-
-        for problem_file in problem_files:
-            problem_dir = problem_file + "/positive.pddl"
-            task = parse_problem(problem_dir)
-            description = ""
-            
-            keys, cells, shapes = [], [], []
-            
-            for i in task.objects:
-                if i.name.startswith("key"):
-                    keys.append(i)
-                elif i.name.startswith("p"):
-                    cells.append(i)
-                elif i.name.startswith("shape"):
-                    shapes.append(i)
-            
-            description += f"You have {len(keys)} keys, {len(cells)} places, and {len(shapes)} shapes. \n"
-            description += f"Inititally, the robot arm is empty and you have the following: \n"
-            
-            at_robot_desc = ""
-            at_desc = ""
-            conn_desc = ""
-            key_shape_desc = ""
-            lock_shape_desc = ""
-            locked_desc = ""
-            open_desc = ""
-            
-            for atom in task.init:
-                if "at-robot" == atom.name:
-                    at_robot_desc += f"Robot is at place {atom.terms[0].name}. \n"
-                elif "at" == atom.name:
-                    at_desc += f"Key {atom.terms[0].name} is at place {atom.terms[1].name}. \n"
-                elif "conn" == atom.name:
-                    conn_desc += f"Place {atom.terms[0].name} is connected to place {atom.terms[1].name}. \n"
-                elif "key-shape" == atom.name:
-                    key_shape_desc += f"Key {atom.terms[0].name} is shaped {atom.terms[1].name}. \n"
-                elif "lock-shape" == atom.name:
-                    lock_shape_desc += f"Lock {atom.terms[0].name} is shaped {atom.terms[1].name}. \n"
-                elif "locked" == atom.name:
-                    locked_desc += f"Place {atom.terms[0].name} is locked. \n"
-                elif "open" == atom.name:
-                    open_desc += f"Place {atom.terms[0].name} is open. \n"
-            
-            description += at_robot_desc + at_desc + conn_desc + key_shape_desc + lock_shape_desc + locked_desc + open_desc
-            description += "\nThe goal is the following: \n"
-            
-            goals = get_goals(task)
-            if len(goals) > 1:
-                for goal in goals:
-                    if goal.name == "at-robot":
-                        description += f"Robot should be at place {goal.terms[0].name}. \n"
-            else:
-                if task.goal.name == "at-robot":
-                    description += f"Robot should be at place {task.goal.terms[0].name}. \n"
-                
-            write_anchor_files(problem_file, description)
+
+    template = NLTemplate([
+        Text("You have {keys} keys, {places} places, and {shapes} shapes. \n"),
+        Text("Inititally, the robot arm is empty and you have the following: \n"),
+        Atoms({"at-robot": "Robot is at place {0}. \n"}),
+        Atoms({"at": "Key {0} is at place {1}. \n"}),
+        Atoms({"conn": "Place {0} is connected to place {1}. \n"}),
+        Atoms({"key-shape": "Key {0} is shaped {1}. \n"}),
+        Atoms({"lock-shape": "Lock {0} is shaped {1}. \n"}),
+        Atoms({"locked": "Place {0} is locked. \n"}),
+        Atoms({"open": "Place {0} is open. \n"}),
+        Text("\nThe goal is the following: \n"),
+        Atoms({"at-robot": "Robot should be at place {0}. \n"}, source="goal"),
+    ])
+
+    def context(self, task, index):
+        count = {"keys": 0, "places": 0, "shapes": 0}
+        
+        for i in task.objects:
+            if i.name.startswith("key"):
+                count["keys"] += 1
+            elif i.name.startswith("p"):
+                count["places"] += 1
+            elif i.name.startswith("shape"):
+                count["shapes"] += 1
+
+        return count
+
+
+DOMAINS = {domain.__name__.lower(): domain for domain in (
+    Blocksworld, Barman, Floortile, Grippers, Storage, Termes, Logistics, Rovers, Hiking, MiniGrid,
+)}
+
+
+def iter_dataset_records(root_dir: str, num_workers: int = None, parse_cache: str = None):
+    """
+    Streams the records of every domain dataset in `root_dir` (e.g.
+    `data/01_raw_dataset/training`), each converted by the domain of the same
+    name in `DOMAINS`. See `Domain.iter_records`.
+    """
+    for dataset_dir in list_dataset_dirs(root_dir):
+        name = os.path.basename(dataset_dir)
+        if name not in DOMAINS:
+            print(f"No converter for {name}, skipped")
+            continue
+        yield from DOMAINS[name]().iter_records(dataset_dir, num_workers=num_workers, parse_cache=parse_cache)
 
 
 if __name__ == "__main__":
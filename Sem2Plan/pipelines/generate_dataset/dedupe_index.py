@@ -0,0 +1,48 @@
+"""
+This module contains the on-disk dedupe index for generated PDDL problems.
+
+The index is an append-only text file with one canonical problem hash per line
+(see `Sem2Plan.utils.pddl_hashing`), kept across generation runs. By default
+each domain directory has its own index, so it goes away with the problems it
+records. The domain name is part of the canonical form, so an index can also be
+shared by several domains.
+"""
+
+import os
+
+
+class DedupeIndex:
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.hashes = set()
+
+        index_dir = os.path.dirname(index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                self.hashes.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, problem_hash: str) -> bool:
+        return problem_hash in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, problem_hash: str) -> bool:
+        """
+        Records a problem hash. Returns False if the hash was already known.
+        """
+        if problem_hash in self.hashes:
+            return False
+
+        self.hashes.add(problem_hash)
+        with open(self.index_path, "a") as f:
+            f.write(problem_hash + "\n")
+        return True
+
+
+def get_default_index_path(dataset_dir: str) -> str:
+    """The index lives in the domain directory, e.g. `data/01_raw_dataset/training/termes/dedupe_index.txt`."""
+    return os.path.join(dataset_dir, "dedupe_index.txt")
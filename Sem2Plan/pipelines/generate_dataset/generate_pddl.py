@@ -2,280 +2,395 @@
 This module contains classes that generates PDDL problems
 """
 
-import os, argparse, hashlib, tempfile
+import os, argparse, asyncio, itertools, warnings
 from abc import ABC, abstractmethod
-import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing, nullcontext
 import numpy
-from pddl.parser.problem import ProblemParser
 from pddl.core import Problem
 import random
+from ...utils.problem_store import open_problem_store, POSITIVE_FILE_NAME
+from ...utils.pddl_hashing import canonical_problem_hash
+from ...utils.problem_cache import ParsedProblemCache, get_default_cache_dir, parse_problem, parse_problem_cached
+from ...utils.timing import StageTimer, timed_call
+from .checkpoint import GenerationCheckpoint
+from .dedupe_index import DedupeIndex, get_default_index_path
+from .generator_runner import GeneratorRunner
+from .native_generators import (
+    generate_blocksworld_problem, generate_grippers_problem, generate_logistics_problem,
+    generate_termes_boards, generate_termes_problem, board_to_str,
+)
+
+
+def get_problem_id(iteration) -> str:
+    return f"p{iteration:02d}"
+
+
+def write_file(store, iteration, desc: str, file_name: str = POSITIVE_FILE_NAME):
+    # Write the PDDL problem file to the dataset's problem store (see `open_problem_store`)
+    store.write(get_problem_id(iteration), file_name, desc)
+
+
+def count_existing_problems(store) -> int:
+    return len(store.problem_ids())
+
+
+def parse_generated_problem(desc: str):
+    """
+    Parses a generated problem in memory, so each accepted problem is written to
+    disk exactly once, already normalized. Executed inside the worker processes,
+    so everything returned here has to be picklable.
+
+    The raw generator output is never read again, so it is not cached: the
+    coordinator caches the returned problem under its normalized text once the
+    problem is accepted.
+
+    Returns:
+    - (parsed_problem, problem_hash, problem) where `parsed_problem` is the
+      normalized text, `problem_hash` the canonical hash of the parsed problem
+      and `problem` the parsed `Problem`.
+    """
+    problem = parse_problem(desc)
+    return Problem.__str__(problem), canonical_problem_hash(problem), problem
+
+
+def generate_native_problem(domain, job, seed):
+    """
+    Builds the problem of a job with the domain's in-process generator, seeded
+    with `seed` (a `numpy.random.SeedSequence`). Same return value as
+    `parse_generated_problem`, without the problem: a built problem is not what
+    parsing its text gives (e.g. typed goal terms), so it is not cached.
+    """
+    problem = domain.native_problem(job, numpy.random.default_rng(seed))
+    return Problem.__str__(problem), canonical_problem_hash(problem), None
+
+
+def iter_job_seeds(entropy, start: int = 0):
+    """
+    Yields an independent `SeedSequence` per job, starting at job `start`. Job i
+    gets the i-th child of `SeedSequence(entropy)`, so any job can be reseeded.
+    """
+    for job_index in itertools.count(start):
+        yield numpy.random.SeedSequence(entropy, spawn_key=(job_index,))
+
+
+async def iter_job_results(domain, jobs, runner: GeneratorRunner, executor, window: int, job_seeds=None,
+                           timer: StageTimer = None):
+    """
+    Yields `(job, (parsed_problem, problem_hash, problem))` (see `parse_generated_problem`)
+    in the same order the jobs were drawn, or `(job, (None, None, None))` for jobs
+    whose generator failed or printed something that does not parse (recorded in
+    `runner.failures` with the reason "parse").
+
+    Up to `window` jobs are scheduled ahead: `runner` runs their generator
+    processes concurrently and each output is parsed on `executor` as soon as
+    it is available, so process start-up overlaps with the Lark parsing.
+    If `job_seeds` is given, jobs are built in-process on `executor` by the
+    domain's native generator instead, one seed per job.
+    The time spent on the workers is recorded in `timer` ("native" or "parse").
+    """
+    loop = asyncio.get_running_loop()
+    timer = timer or StageTimer(type(domain).__name__)
+
+    async def process_job(job, seed):
+        if seed is not None:
+            result, seconds = await loop.run_in_executor(executor, timed_call, generate_native_problem, domain, job, seed)
+            timer.record("native", seconds)
+            return result
+
+        desc, command = await runner.run(domain, job)
+        if desc is None:
+            return None, None, None
+        try:
+            result, seconds = await loop.run_in_executor(executor, timed_call, parse_generated_problem, desc)
+        except Exception as e:  # e.g. a usage message printed with exit code 0
+            runner.failures.record(command, "parse", f"{type(e).__name__}: {e}")
+            return None, None, None
+        timer.record("parse", seconds)
+        return result
+
+    pending = deque()
+    try:
+        for job in jobs:
+            seed = next(job_seeds) if job_seeds is not None else None
+            pending.append((job, asyncio.ensure_future(process_job(job, seed))))
+            if len(pending) >= window:
+                job, task = pending.popleft()
+                yield job, await task
+
+        while pending:
+            job, task = pending.popleft()
+            yield job, await task
+    finally:
+        # stop scheduled jobs once the coordinator has enough problems
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
 
 
-def write_file(problem_dir: str, iteration, desc: str):
-    
-    # Create problem subdirectory
-    problem_subdir = os.path.join(problem_dir, f"p{iteration:02d}")
-    os.makedirs(problem_subdir, exist_ok=True)
-
-    # Write the PDDL problem file
-    problem_path = os.path.join(problem_subdir, "positive.pddl")
-    with open(problem_path, "w") as f:
-        f.write(desc)
-        
-    return problem_path
-        
-def parse_problem_file(problem_file_path):
-        with open(problem_file_path, "r") as f:
-            problem_str = f.read()
-        parsed_problem = ProblemParser()(problem_str)
-        return Problem.__str__(parsed_problem)
+class Domain(ABC):
 
+    # whether the domain implements `native_problem(job, rng) -> Problem`, building the
+    # problem of a job in-process and drawing from the `numpy.random.Generator` rng
+    native_backend = False
 
-class Domain(ABC):
+    def generate_problem(self, dataset_dir: str, args):
+        """
+        Generates `args.max_iterations` unique problems into `dataset_dir/problems/pNN`.
+
+        Generator processes are launched by a `GeneratorRunner` with at most
+        `args.max_in_flight` of them running at once (defaults to twice the
+        number of workers), a per-call `args.generator_timeout` in seconds and
+        `args.generator_retries` retries. Their output is parsed on
+        `args.num_workers` processes (defaults to 1). This method is the
+        coordinator: it owns the dedupe and hands out the `pNN` iteration
+        numbers in job order, so the output does not depend on the number of
+        workers.
+
+        With `args.backend == "native"`, domains that have an in-process
+        generator (`native_backend = True`) build their problems on the workers
+        instead, seeded from `args.seed`, without spawning any process.
+
+        Problems are deduped on their canonical hash through a persistent
+        `DedupeIndex` (`args.dedupe_index`, by default `dataset_dir/dedupe_index.txt`).
+        A new index starts from the hashes of the problems already in the store.
+        Problems already in `dataset_dir` count towards `max_iterations`, so a
+        rerun only tops the directory up. A domain with a finite job list
+        (e.g. Termes) can run out of jobs first: the run then warns and records
+        the shortfall in the checkpoint manifest.
+
+        Every accepted problem is checkpointed (see `GenerationCheckpoint`): a
+        killed run that is started again with the same arguments resumes from
+        its last committed problem and draws the same jobs it would have drawn.
+
+        Problems are stored through `open_problem_store`: one directory per
+        problem, or packed shards if `args.storage == "packed"`. An existing
+        dataset keeps the backend it was created with.
+
+        Accepted problems parsed from generator output are kept in a
+        `ParsedProblemCache` (`args.parse_cache`, by default shared by all
+        domains of the parent directory) under the text of their `positive.pddl`,
+        which the conversion and the training dataset read them back from.
+
+        Each stage (generator call, parse, dedupe, write) is timed per problem.
+        A summary table is printed at the end of the run and written as JSON to
+        `args.timing_report` (by default `dataset_dir/generation_timing.json`).
+        """
+        max_iters = args.max_iterations
+        num_workers = getattr(args, "num_workers", 1)
+        index_path = getattr(args, "dedupe_index", None) or get_default_index_path(dataset_dir)
+        cache = ParsedProblemCache(getattr(args, "parse_cache", None) or get_default_cache_dir(dataset_dir))
+
+        use_native = getattr(args, "backend", "subprocess") == "native"
+        if use_native and not self.native_backend:
+            raise ValueError(f"{type(self).__name__} has no native generator backend")
+
+        store = open_problem_store(dataset_dir, packed=getattr(args, "storage", "directory") == "packed")
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        rebuild_index = not os.path.exists(index_path)
+        seen_problems = DedupeIndex(index_path)  # Store unique problems
+        if rebuild_index:
+            # a new index starts from the stored problems, e.g. written before the index was kept per domain
+            for problem_id in store.problem_ids():
+                problem = parse_problem_cached(store.read(problem_id, POSITIVE_FILE_NAME), cache)
+                seen_problems.add(canonical_problem_hash(problem))
+
+        checkpoint = GenerationCheckpoint(dataset_dir, type(self).__name__, args,
+                                          start_iteration=count_existing_problems(store))
+        for problem_hash in checkpoint.accepted_hashes:
+            seen_problems.add(problem_hash)  # in case the run was killed right after its last commit
+
+        if checkpoint.iteration >= max_iters:
+            store.close()
+            return {}
+
+        timer = StageTimer(type(self).__name__)
+        runner = GeneratorRunner(
+            max_in_flight=getattr(args, "max_in_flight", None) or 2 * num_workers,
+            timeout=getattr(args, "generator_timeout", 60.0),
+            max_retries=getattr(args, "generator_retries", 2),
+            timer=timer,
+        )
+
+        async def coordinate(iteration, job_index):
+            with ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else nullcontext() as executor:
+                # replay the job sequence up to where the checkpointed run stopped
+                jobs = itertools.islice(self.iter_jobs(args), job_index, None)
+                job_seeds = iter_job_seeds(checkpoint.entropy, start=job_index) if use_native else None
+                results = iter_job_results(self, jobs, runner, executor,
+                                           window=2 * runner.max_in_flight, job_seeds=job_seeds, timer=timer)
+                async with aclosing(results):
+                    async for job, (parsed_problem, problem_hash, problem) in results:
+                        timer.count("jobs")
+                        if parsed_problem is None:
+                            timer.count("failed")
+                            job_index += 1
+                            continue
+
+                        with timer.time("dedupe"):
+                            is_new = problem_hash not in seen_problems
+
+                        if is_new:
+                            with timer.time("write"):
+                                # positive.pddl goes last: its presence marks a complete problem directory
+                                for file_name, content in self.extra_files(job).items():
+                                    write_file(store, iteration, content, file_name=file_name)
+                                write_file(store, iteration, parsed_problem)
+                                checkpoint.commit(iteration, job_index, problem_hash)
+                                seen_problems.add(problem_hash)
+                                if problem is not None:
+                                    cache.put(parsed_problem, problem)  # only accepted problems, under their stored text
+
+                            timer.count("accepted")
+                            iteration += 1
+                        else:
+                            timer.count("duplicates")
+
+                        job_index += 1
+
+                        if iteration >= max_iters:
+                            break  # Stop if reaching limit
+
+        with store:
+            asyncio.run(coordinate(checkpoint.iteration, checkpoint.job_index))
+
+        checkpoint.record_result(checkpoint.iteration, max_iters)
+        if checkpoint.iteration < max_iters:
+            warnings.warn(f"{type(self).__name__} ran out of jobs: {checkpoint.iteration} of {max_iters} problems "
+                          f"in {dataset_dir} ({timer.counters.get('duplicates', 0)} duplicates, "
+                          f"{timer.counters.get('failed', 0)} failed jobs)")
+
+        timer.print_summary()
+        timer.write_report(getattr(args, "timing_report", None) or os.path.join(dataset_dir, "generation_timing.json"))
+
+        if len(runner.failures) > 0:
+            print(f"Generator failures: {runner.failures.summary()}")
+        return runner.failures.summary()
 
     @abstractmethod
-    def generate_problem(self, pddl_generator_dir: str, dataset_dir: str, args):
+    def iter_jobs(self, args):
         """
-        Abstract method to convert PDDL problem files into 
-        natural language components.
+        Yields the generator jobs (by default, commands) for this domain. Random
+        problem sizes are drawn here, in the coordinator, so the job sequence is
+        the same for any number of workers.
         """
 
+    def build_command(self, job, work_dir: str) -> list:
+        """
+        Returns the generator command for a job. `work_dir` is a fresh temporary
+        directory for generators that need input or output files.
+        """
+        return job
+
+    def read_output(self, stdout: str, work_dir: str) -> str:
+        """Returns the raw PDDL problem produced by the generator command."""
+        return stdout
+
+    def extra_files(self, job) -> dict:
+        """Additional files to store next to `positive.pddl` for an accepted job."""
+        return {}
+
 
 class Blocksworld(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    native_backend = True
+
+    def iter_jobs(self, args):
         ops = args.ops
         num_blocks = args.blocks
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-
-            command = ['pddl-generators/blocksworld/blocksworld', str(ops), str(num_blocks)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-            
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+
+        while True:
+            yield {"ops": ops, "blocks": num_blocks}
+
+    def build_command(self, job, work_dir: str) -> list:
+        return ['pddl-generators/blocksworld/blocksworld', str(job["ops"]), str(job["blocks"])]
+
+    def native_problem(self, job, rng) -> Problem:
+        return generate_blocksworld_problem(rng, job["blocks"], ops=job["ops"])
 
 
 class Barman(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    def iter_jobs(self, args):
         num_cocktails = args.cocktails
         num_ingredients = args.ingredients
         num_shots = args.shots
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-
-            command = ['pddl-generators/barman/barman-generator.py', str(num_cocktails), str(num_ingredients), str(num_shots)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-            
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
-        
+
+        while True:
+            yield ['pddl-generators/barman/barman-generator.py', str(num_cocktails), str(num_ingredients), str(num_shots)]
+
 
 class Floortile(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    def iter_jobs(self, args):
         name = args.name
         num_rows = args.rows
         num_columns = args.columns
         num_robots = args.robots
         mode_flag = args.mode_flag
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-
-            command = ['pddl-generators/floortile/floortile-generator.py', 
-                       name, str(num_rows), str(num_columns), str(num_robots), mode_flag]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+
+        while True:
+            yield ['pddl-generators/floortile/floortile-generator.py',
+                   name, str(num_rows), str(num_columns), str(num_robots), mode_flag]
 
 
 class Grippers(Domain):
-    def generate_problem(self, dataset_dir: str, args):
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-            
+    native_backend = True
+
+    def iter_jobs(self, args):
+        while True:
+
             num_robots = random.randint(3, args.robots)
             num_rooms = random.randint(3, args.rooms)
             num_balls = random.randint(3, args.balls)
 
-            command = ['pddl-generators/grippers/grippers', "-n", str(num_robots), "-r", str(num_rooms), "-o", str(num_balls)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+            yield {"robots": num_robots, "rooms": num_rooms, "balls": num_balls}
+
+    def build_command(self, job, work_dir: str) -> list:
+        return ['pddl-generators/grippers/grippers', "-n", str(job["robots"]), "-r", str(job["rooms"]), "-o", str(job["balls"])]
+
+    def native_problem(self, job, rng) -> Problem:
+        return generate_grippers_problem(rng, job["robots"], job["rooms"], job["balls"])
 
 
 class Storage(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    def iter_jobs(self, args):
         name = args.name
         num_containers = args.containers
         num_crates = args.crates
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-            
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file_name = temp_file.name  # Temporary file for the command's argument
+
+        while True:
 
             num_hoists = random.randint(3, args.hoists)
             num_depots = random.randint(1, args.depots)
             num_store_areas = random.randint(3, args.store_areas)
-            
+
             dynamic_seed = random.randint(1, 10000)
-            command = ['pddl-generators/storage/storage',
+            yield ['pddl-generators/storage/storage',
                 '-p', str(name),                   # Added the problem header
                 '-n', str(num_hoists),             # Number of hoists
                 '-d', str(num_depots),             # Number of depots
                 '-o', str(num_containers),         # Number of containers
                 '-s', str(num_store_areas),        # Number of store-areas
                 '-c', str(num_crates),             # Number of crates
-                '-e', str(dynamic_seed), temp_file_name]
-            
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-            
-                with open(temp_file_name, 'r') as temp_file:
-                    desc = temp_file.read()
-                    
-                if not desc:
-                    continue
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                continue
-            
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+                '-e', str(dynamic_seed)]
+
+    def build_command(self, job, work_dir: str) -> list:
+        # the storage generator writes the problem to the file given as last argument
+        return job + [os.path.join(work_dir, "problem.pddl")]
+
+    def read_output(self, stdout: str, work_dir: str) -> str:
+        with open(os.path.join(work_dir, "problem.pddl"), 'r') as temp_file:
+            return temp_file.read()
 
 
 class Termes(Domain):
-    def generate_problem(self, dataset_dir, args):
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
+    native_backend = True
+
+    def iter_jobs(self, args):
+
         (size_x, size_y) = (args.size_x, args.size_y)
-        height = args.height
-        num_towers = args.towers
         seed = args.seed
-        max_iters = args.max_iterations
 
-        numpy.random.seed(seed)
-
-        iteration = 0
-        
         for range_num_towers, range_height in [
             ([1, 2], range(3, 8)),
             ([3, 4], range(3, 6)),
@@ -283,122 +398,63 @@ class Termes(Domain):
         ]:
             for height in range_height:
                 for num_towers in range_num_towers:
-                    for i in range(10):
-                        board_name, board_str = self.gen_board(
-                            size_x, size_y, height, num_towers, seed, dataset_dir, iteration
+                    # the 10 boards of a setting are drawn at once, board i from its own seed
+                    seeds = list(range(seed, seed + 10))
+                    boards = generate_termes_boards(seeds, size_x, size_y, height, num_towers)
+
+                    for board_seed, board in zip(seeds, boards):
+                        board_name = "random_towers_{}x{}_{}_{}_{}.txt".format(
+                            size_x, size_y, height, num_towers, board_seed
                         )
-                        
-                        problem_subdir = os.path.join(problem_dir, f"p{iteration:02d}")
-                        os.makedirs(problem_subdir, exist_ok=True)
-                        
-                        problem_path = os.path.join(problem_subdir, board_name)
-                        with open(problem_path, "w") as f:
-                            f.write(board_str)
-                            
-                        command = ['pddl-generators/termes/generate.py', 
-                                   'pddl-generators/termes/boards/empty.txt', problem_path, 'pddl', '--dont_remove_slack']
-                        
-                        try:
-                            result = subprocess.run(command, check=True, text=True, capture_output=True)
-                            desc = result.stdout  # Capture the standard output as a string
-                        except subprocess.CalledProcessError as e:
-                            print(f"Error running the command: {e}")
-                            
-                        problem_path = write_file(problem_dir, iteration, desc)
-                        parsed_problem = parse_problem_file(problem_path)
-                        
-                        with open(problem_path, 'w') as f:
-                            f.write(parsed_problem)
-                        
-                        seed += 1
-                        iteration += 1
-                    
-                        if iteration >= max_iters:
-                            break  # Stop if reaching limit
-        
-                        
-    def gen_board(self, size_x, size_y, height, num_towers, seed, dataset_dir, iteration):
-        numpy.random.seed(seed)
-
-        board = [[0 for x in range(size_x)] for y in range(size_y)]
-        cells = [(x, y) for x in range(size_x) for y in range(size_y)]
-
-        first = True
-        for i in numpy.random.choice(range(len(cells)), num_towers, replace=False):
-            (x, y) = cells[i]
-            col_height = height if first else numpy.random.choice(range(2, height + 1))
-            first = False
-            board[y][x] = col_height
-            
-        board_name = "random_towers_{}x{}_{}_{}_{}.txt".format(
-            size_x, size_y, height, num_towers, seed
-        )
-        
-        board_str = ""
-        
-        for row in board:
-            board_str += " ".join(map(str, row)) + "\n"
-            
-        return board_name, board_str
+                        yield {"board_name": board_name, "board": board}
+
+                    seed += 10
+
+    def build_command(self, job, work_dir: str) -> list:
+        board_path = os.path.join(work_dir, job["board_name"])
+        with open(board_path, "w") as f:
+            f.write(board_to_str(job["board"]))
+
+        return ['pddl-generators/termes/generate.py',
+                'pddl-generators/termes/boards/empty.txt', board_path, 'pddl', '--dont_remove_slack']
+
+    def extra_files(self, job) -> dict:
+        # keep the board next to the problem it was generated from
+        return {job["board_name"]: board_to_str(job["board"])}
+
+    def native_problem(self, job, rng) -> Problem:
+        return generate_termes_problem(job["board"], job["board_name"])
 
 
 class Logistics(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    native_backend = True
+
+    def iter_jobs(self, args):
         city_size = args.city_size
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-            
+
+        while True:
+
             num_airplanes = random.randint(3, args.airplanes)
             num_cities = random.randint(3, args.cities)
             num_packages = random.randint(3, args.packages)
             num_trucks = random.randint(3, args.trucks)
 
-            command = ['pddl-generators/logistics/logistics', "-a", str(num_airplanes), "-c", 
-                       str(num_cities), "-s", str(city_size), "-p", str(num_packages), "-t", str(num_trucks)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-                print(desc)
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+            yield {"airplanes": num_airplanes, "cities": num_cities, "city_size": city_size,
+                   "packages": num_packages, "trucks": num_trucks}
+
+    def build_command(self, job, work_dir: str) -> list:
+        return ['pddl-generators/logistics/logistics', "-a", str(job["airplanes"]), "-c", str(job["cities"]),
+                "-s", str(job["city_size"]), "-p", str(job["packages"]), "-t", str(job["trucks"])]
+
+    def native_problem(self, job, rng) -> Problem:
+        return generate_logistics_problem(rng, job["airplanes"], job["cities"], job["city_size"],
+                                          job["packages"], job["trucks"])
 
 
 class Rovers(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    def iter_jobs(self, args):
+        while True:
 
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-            
             num_rovers = random.randint(2, args.rovers)
             num_waypoints = random.randint(args.rovers + 1, args.waypoints)
             num_objectives = random.randint(2, args.objectives)
@@ -406,118 +462,34 @@ class Rovers(Domain):
             num_goals = random.randint(2, args.goals)
             dynamic_seed = random.randint(1, args.seed)
 
-            command = ['pddl-generators/rovers/rovgen', str(dynamic_seed), str(num_rovers), str(num_waypoints), str(num_objectives), str(num_cameras), str(num_goals)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-                print(desc)
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+            yield ['pddl-generators/rovers/rovgen', str(dynamic_seed), str(num_rovers), str(num_waypoints), str(num_objectives), str(num_cameras), str(num_goals)]
 
 
 class Hiking(Domain):
-    def generate_problem(self, dataset_dir: str, args):
+    def iter_jobs(self, args):
+        while True:
 
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
-        while len(seen_problems) < max_iters:
-            
             num_couples = random.randint(2, args.couples)
             num_cars = random.randint(num_couples+1, args.cars)
             num_places = random.randint(2, args.places)
             dynamic_seed = random.randint(1, args.seed)
 
-            command = ['pddl-generators/hiking/generator.py', str(num_couples), str(num_cars), str(num_places), str(dynamic_seed)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-                print(desc)
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
+            yield ['pddl-generators/hiking/generator.py', str(num_couples), str(num_cars), str(num_places), str(dynamic_seed)]
 
 
 class MiniGrid(Domain):
-    def generate_problem(self, dataset_dir: str, args):
-
-        max_iters = args.max_iterations
-        
-        seen_problems = set()  # Store unique problems
-        iteration = 0
-        
-        problem_dir = os.path.join(dataset_dir, "problems")
-        os.makedirs(problem_dir, exist_ok=True)
-        
+    def iter_jobs(self, args):
         pddl_gen_path = "pddl-generators/minigrid/"
-        
-        while len(seen_problems) < max_iters:
-            
+
+        while True:
+
             dynamic_seed = random.randint(1, args.seed)
 
-            command = [f'{pddl_gen_path}mini_grid.py', "--seed", str(dynamic_seed), f"{pddl_gen_path}floorplans/4room2.fpl", str(0)]
-
-            try:
-                result = subprocess.run(command, check=True, text=True, capture_output=True)
-                desc = result.stdout  # Capture the standard output as a string
-                print(desc)
-            except subprocess.CalledProcessError as e:
-                print(f"Error running the command: {e}")
-                
-            problem_hash = hashlib.md5(desc.encode()).hexdigest()  # Generate a unique hash for the problem
-            
-            if problem_hash not in seen_problems:
-                seen_problems.add(problem_hash)
-                problem_path = write_file(problem_dir, iteration, desc)
-                parsed_problem = parse_problem_file(problem_path)
-                
-                with open(problem_path, 'w') as f:
-                    f.write(parsed_problem)
-                    
-                iteration += 1
-
-            if iteration >= max_iters:
-                break  # Stop if reaching limit
-    
+            yield [f'{pddl_gen_path}mini_grid.py', "--seed", str(dynamic_seed), f"{pddl_gen_path}floorplans/4room2.fpl", str(0)]
+
 
 
-# if __name__ == "__main__":
+if __name__ == "__main__":
     
     # # BARMAN
     # parser = argparse.ArgumentParser(description="Barman Problem Generator")
@@ -538,6 +510,7 @@ class MiniGrid(Domain):
     parser.add_argument("--ops", type=int, default=4)
     parser.add_argument("--blocks", type=int, default=10)
     parser.add_argument("--max_iterations", type=int, default=3)
+    parser.add_argument("--num_workers", type=int, default=1)
     args = parser.parse_args()
 
     b = Blocksworld()
@@ -0,0 +1,120 @@
+"""
+This module runs the external pddl-generators with asyncio.
+
+The runner bounds the number of generator processes in flight, kills calls that
+exceed a per-call timeout, retries failed calls with exponential backoff and
+keeps a structured account of every call that ultimately failed.
+"""
+
+import asyncio
+import subprocess
+import tempfile
+from contextlib import nullcontext
+
+
+async def run_command(command: list, timeout: float = None) -> str:
+    """
+    Runs `command` and returns its standard output. Raises `asyncio.TimeoutError`
+    if it runs longer than `timeout` seconds and `subprocess.CalledProcessError`
+    if it exits with a non-zero code. The process is killed if the call does not
+    complete (timeout or cancellation).
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout.decode(), stderr.decode())
+
+    return stdout.decode()
+
+
+class GeneratorFailures:
+    """
+    Keeps track of generator calls that failed after all retries.
+
+    Attributes:
+        counts (dict): number of failed jobs per reason ("timeout", "error", "empty", or "parse" for
+                       output that is not a PDDL problem).
+        retries (int): number of retried calls.
+        failed_jobs (list): one dict per failed job with its command, reason and detail.
+    """
+
+    def __init__(self):
+        self.counts = {"timeout": 0, "error": 0, "empty": 0, "parse": 0}
+        self.retries = 0
+        self.failed_jobs = []
+
+    def record(self, command, reason: str, detail: str = ""):
+        self.counts[reason] += 1
+        self.failed_jobs.append({"command": command, "reason": reason, "detail": detail})
+
+    def __len__(self) -> int:
+        return len(self.failed_jobs)
+
+    def summary(self) -> dict:
+        return {"failed": len(self), "retries": self.retries, **self.counts}
+
+
+class GeneratorRunner:
+    """
+    Runs generator jobs for a `generate_pddl.Domain`.
+
+    Args:
+        max_in_flight (int): maximum number of generator processes running at once.
+        timeout (float): seconds after which a generator call is killed (None disables it).
+        max_retries (int): number of times a timed out or failed call is retried.
+        backoff (float): delay before the first retry, doubled on each further retry.
+        timer (StageTimer): optional timer, records each generator call as the "generator" stage.
+    """
+
+    def __init__(self, max_in_flight: int = 4, timeout: float = 60.0, max_retries: int = 2, backoff: float = 0.5,
+                 timer=None):
+        self.max_in_flight = max_in_flight
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failures = GeneratorFailures()
+        self.timer = timer
+
+    async def run(self, domain, job):
+        """
+        Returns `(desc, command)`: the raw PDDL problem generated for `job`, or
+        None if the job failed, and the last command run for it.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self.failures.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+            with tempfile.TemporaryDirectory() as work_dir:
+                command = domain.build_command(job, work_dir)
+                try:
+                    async with self.semaphore:
+                        with self.timer.time("generator") if self.timer is not None else nullcontext():
+                            stdout = await run_command(command, self.timeout)
+                    desc = domain.read_output(stdout, work_dir)
+                except asyncio.TimeoutError:
+                    reason, detail = "timeout", f"{command} timed out after {self.timeout}s"
+                    continue
+                except (subprocess.CalledProcessError, OSError) as e:
+                    reason, detail = "error", str(e)
+                    continue
+
+            if not desc:
+                # not a transient failure, the coordinator simply moves on to the next job
+                self.failures.record(command, "empty")
+                return None, command
+
+            return desc, command
+
+        print(f"Error running the command: {detail}")
+        self.failures.record(command, reason, detail)
+        return None, command
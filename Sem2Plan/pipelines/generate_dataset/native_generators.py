@@ -0,0 +1,235 @@
+"""
+This module contains in-process replacements for some of the compiled
+pddl-generators. They build `pddl.core.Problem` objects directly from a
+`numpy.random.Generator`, so no process is spawned per problem.
+
+Each function mirrors the problem layout (names, predicates, goal order) and
+the random distribution of its generator:
+    - Blocksworld: `pddl-generators/blocksworld` (uniformly random states, bwstates)
+    - Grippers: `pddl-generators/grippers`
+    - Logistics: `pddl-generators/logistics`
+    - Termes: `pddl-generators/termes/generate.py`, together with a batched
+      random towers board generator
+"""
+
+import os
+from functools import lru_cache
+import numpy as np
+from pddl.logic import Constant, Predicate
+from pddl.logic.base import And, Not
+from pddl.core import Problem
+
+
+@lru_cache(maxsize=None)
+def count_blocksworld_states(num_floating: int, num_grounded: int) -> int:
+    """
+    Number of ways to finish a blocksworld state with `num_floating` towers
+    that are not yet on the table and `num_grounded` towers that are.
+    The next floating tower either goes on the table or on top of any of the
+    other `num_floating - 1 + num_grounded` towers.
+    """
+    if num_floating == 0:
+        return 1
+    return (
+        count_blocksworld_states(num_floating - 1, num_grounded + 1)
+        + (num_floating - 1 + num_grounded) * count_blocksworld_states(num_floating - 1, num_grounded)
+    )
+
+
+def sample_blocksworld_state(rng: np.random.Generator, num_blocks: int) -> list:
+    """
+    Draws a blocksworld state uniformly at random (Slaney & Thiebaux's bwstates).
+
+    Returns:
+    - below: list where below[i] is the block under block i, or -1 if i is on the table.
+    """
+    below = [-1] * num_blocks
+    # each tower is stored as [bottom, top]
+    floating = [[i, i] for i in range(num_blocks)]
+    grounded = []
+
+    while floating:
+        tower = floating.pop()
+        num_floating, num_grounded = len(floating) + 1, len(grounded)
+
+        p_table = count_blocksworld_states(num_floating - 1, num_grounded + 1) / count_blocksworld_states(num_floating, num_grounded)
+        if rng.random() < p_table:
+            grounded.append(tower)
+            continue
+
+        # put the tower on top of one of the other towers, uniformly
+        target_idx = rng.integers(0, num_floating - 1 + num_grounded)
+        target = floating[target_idx] if target_idx < len(floating) else grounded[target_idx - len(floating)]
+        below[tower[0]] = target[1]
+        target[1] = tower[1]
+
+    return below
+
+
+def generate_blocksworld_problem(rng: np.random.Generator, num_blocks: int, ops: int = 4) -> Problem:
+    blocks = [Constant(f"b{i + 1}") for i in range(num_blocks)]
+
+    init_below = sample_blocksworld_state(rng, num_blocks)
+    goal_below = sample_blocksworld_state(rng, num_blocks)
+
+    init = [Predicate("arm-empty")] if ops == 4 else []
+    for i, j in enumerate(init_below):
+        if j == -1:
+            init.append(Predicate("on-table", blocks[i]))
+        else:
+            init.append(Predicate("on", blocks[i], blocks[j]))
+    for i in set(range(num_blocks)) - set(init_below):
+        init.append(Predicate("clear", blocks[i]))
+
+    goal = [Predicate("on", blocks[i], blocks[j]) for i, j in enumerate(goal_below) if j != -1]
+
+    return Problem(
+        name=f"BW-rand-{num_blocks}",
+        domain_name=f"blocksworld-{ops}ops",
+        objects=blocks,
+        init=init,
+        goal=And(*goal),
+    )
+
+
+def generate_grippers_problem(rng: np.random.Generator, num_robots: int, num_rooms: int, num_balls: int) -> Problem:
+    robots = [Constant(f"robot{i + 1}", "robot") for i in range(num_robots)]
+    grippers = [(Constant(f"lgripper{i + 1}", "gripper"), Constant(f"rgripper{i + 1}", "gripper")) for i in range(num_robots)]
+    rooms = [Constant(f"room{i + 1}", "room") for i in range(num_rooms)]
+    balls = [Constant(f"ball{i + 1}", "object") for i in range(num_balls)]
+
+    robot_rooms = rng.integers(0, num_rooms, size=num_robots)
+    ball_rooms = rng.integers(0, num_rooms, size=num_balls)
+    goal_rooms = rng.integers(0, num_rooms, size=num_balls)
+
+    init = []
+    for robot, (lgripper, rgripper), room_idx in zip(robots, grippers, robot_rooms):
+        init.append(Predicate("at-robby", robot, rooms[room_idx]))
+        init.append(Predicate("free", robot, lgripper))
+        init.append(Predicate("free", robot, rgripper))
+    for ball, room_idx in zip(balls, ball_rooms):
+        init.append(Predicate("at", ball, rooms[room_idx]))
+
+    goal = [Predicate("at", ball, rooms[room_idx]) for ball, room_idx in zip(balls, goal_rooms)]
+
+    return Problem(
+        name=f"gripper-{num_robots}-{num_rooms}-{num_balls}",
+        domain_name="gripper-strips",
+        objects=robots + [g for pair in grippers for g in pair] + rooms + balls,
+        init=init,
+        goal=And(*goal),
+    )
+
+
+def generate_logistics_problem(rng: np.random.Generator, num_airplanes: int, num_cities: int, city_size: int,
+                               num_packages: int, num_trucks: int) -> Problem:
+    airplanes = [Constant(f"a{i}") for i in range(num_airplanes)]
+    cities = [Constant(f"c{i}") for i in range(num_cities)]
+    locations = [[Constant(f"l{i}-{j}") for j in range(city_size)] for i in range(num_cities)]
+    packages = [Constant(f"p{i}") for i in range(num_packages)]
+    trucks = [Constant(f"t{i}") for i in range(num_trucks)]
+    # the first location of each city is its airport
+    airports = [city_locations[0] for city_locations in locations]
+
+    init = []
+    init += [Predicate("AIRPLANE", a) for a in airplanes]
+    init += [Predicate("AIRPORT", l) for l in airports]
+    init += [Predicate("CITY", c) for c in cities]
+    init += [Predicate("LOCATION", l) for city_locations in locations for l in city_locations]
+    init += [Predicate("OBJ", p) for p in packages]
+    init += [Predicate("TRUCK", t) for t in trucks]
+    init += [Predicate("in-city", l, c) for c, city_locations in zip(cities, locations) for l in city_locations]
+
+    # every city gets a truck first, the remaining trucks go to random cities
+    for i, truck in enumerate(trucks):
+        city_idx = i if i < num_cities else rng.integers(0, num_cities)
+        init.append(Predicate("at", truck, locations[city_idx][rng.integers(0, city_size)]))
+    for airplane in airplanes:
+        init.append(Predicate("at", airplane, airports[rng.integers(0, num_cities)]))
+
+    def random_location():
+        return locations[rng.integers(0, num_cities)][rng.integers(0, city_size)]
+
+    for package in packages:
+        init.append(Predicate("at", package, random_location()))
+    goal = [Predicate("at", package, random_location()) for package in packages]
+
+    return Problem(
+        name=f"logistics-c{num_cities}-s{city_size}-p{num_packages}-a{num_airplanes}",
+        domain_name="logistics-strips",
+        objects=airplanes + cities + [l for city_locations in locations for l in city_locations] + packages + trucks,
+        init=init,
+        goal=And(*goal),
+    )
+
+
+def generate_termes_boards(seeds, size_x: int, size_y: int, height: int, num_towers: int) -> np.ndarray:
+    """
+    Draws one random towers board per seed, each from its own `numpy.random.Generator`.
+    The first tower has the full `height`, the others a random height in [2, height].
+
+    Returns:
+    - boards: int array of shape (len(seeds), size_y, size_x) with the goal height of each cell.
+    """
+    num_boards, num_cells = len(seeds), size_x * size_y
+    tower_cells = np.empty((num_boards, num_towers), dtype=np.int64)
+    tower_heights = np.full((num_boards, num_towers), height, dtype=np.int64)
+
+    for i, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        tower_cells[i] = rng.choice(num_cells, num_towers, replace=False)
+        tower_heights[i, 1:] = rng.integers(2, height + 1, size=num_towers - 1)
+
+    boards = np.zeros((num_boards, num_cells), dtype=np.int64)
+    boards[np.arange(num_boards)[:, None], tower_cells] = tower_heights
+    return boards.reshape(num_boards, size_y, size_x)
+
+
+def board_to_str(board: np.ndarray) -> str:
+    """The board file format read by `pddl-generators/termes/generate.py`."""
+    return "".join(" ".join(map(str, row)) + "\n" for row in board.tolist())
+
+
+def get_termes_depot(board: np.ndarray):
+    """
+    The depot goes in the middle of the first row, or on the closest free cell
+    of that row if a tower is built there.
+    """
+    size_x = board.shape[1]
+    middle = size_x // 2
+    for x in sorted(range(size_x), key=lambda x: (abs(x - middle), x)):
+        if board[0, x] == 0:
+            return x, 0
+    return middle, 0
+
+
+def generate_termes_problem(board: np.ndarray, board_name: str) -> Problem:
+    """
+    Emits the Termes problem of a board the way `generate.py <empty board> <board> pddl
+    --dont_remove_slack` does: every position and height level is kept.
+    """
+    size_y, size_x = board.shape
+    height = int(board.max())
+
+    numbs = [Constant(f"n{i}", "numb") for i in range(height + 1)]
+    positions = {(x, y): Constant(f"pos-{x}-{y}", "position") for x in range(size_x) for y in range(size_y)}
+    depot = positions[get_termes_depot(board)]
+
+    init = [Predicate("IS-DEPOT", depot), Predicate("at", depot)]
+    init += [Predicate("SUCC", numbs[i + 1], numbs[i]) for i in range(height)]
+    for (x, y), pos in positions.items():
+        init.append(Predicate("height", pos, numbs[0]))
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if (nx, ny) in positions:
+                init.append(Predicate("NEIGHBOR", pos, positions[(nx, ny)]))
+
+    goal = [Predicate("height", pos, numbs[board[y, x]]) for (x, y), pos in positions.items()]
+    goal.append(Not(Predicate("has-block")))
+
+    return Problem(
+        name=f"termes-{size_x * size_y * height:04d}-{size_x}x{size_y}x{height}-{os.path.splitext(board_name)[0]}",
+        domain_name="termes",
+        objects=numbs + list(positions.values()),
+        init=init,
+        goal=And(*goal),
+    )
@@ -0,0 +1,108 @@
+"""
+This module contains the declarative template engine used to render PDDL
+problems into natural language (see `convert_pddl.py`).
+
+A domain describes its text as a list of sections:
+    - Text: a sentence, formatted with the values the domain computes from
+      the problem (counts, grids, ...).
+    - Atoms: one sentence per init or goal atom, picked by predicate name.
+      Asking for several predicates in one section keeps their original order.
+
+`NLTemplate` compiles the sections once (constant text, bound `str.format`
+methods per predicate) and renders a problem by joining the sentences.
+"""
+
+from string import Formatter
+
+
+class Text:
+    """
+    A piece of text. `{field}` placeholders are filled from the context
+    returned by the domain's `context` method.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+
+
+class Atoms:
+    """
+    One sentence per atom of `source` ("init" or "goal").
+
+    Args:
+        templates (dict): predicate name -> sentence template. `{0}`, `{1}`, ...
+            are the names of the atom's terms. The name "*" takes every goal atom.
+        where (callable): optional filter, atoms for which it returns False are skipped.
+        fields (callable): optional function returning the format arguments of
+            an atom, instead of its term names.
+        separator (str): placed between the sentences.
+        suffix (str): added after the last sentence, if there is any.
+    """
+
+    def __init__(self, templates: dict, source: str = "init", where=None, fields=None,
+                 separator: str = "", suffix: str = ""):
+        if source not in ("init", "goal"):
+            raise ValueError(f"Unknown atom source: {source}")
+        if "*" in templates and (len(templates) > 1 or source != "goal"):
+            raise ValueError('"*" has to be the only template of a goal section')
+
+        self.templates = templates
+        self.source = source
+        self.where = where
+        self.fields = fields
+        self.separator = separator
+        self.suffix = suffix
+
+
+def get_term_names(atom) -> list:
+    return [term.name for term in atom.terms]
+
+
+def compile_text(section: Text):
+    if all(field is None for _, field, _, _ in Formatter().parse(section.template)):
+        text = section.template
+        return lambda index, context: text
+
+    format_map = section.template.format_map
+    return lambda index, context: format_map(context)
+
+
+def compile_atoms(section: Atoms):
+    names = tuple(section.templates)
+    formats = {name.lower(): template.format for name, template in section.templates.items()}
+    where, separator, suffix = section.where, section.separator, section.suffix
+    fields = section.fields or get_term_names
+
+    if names == ("*",):
+        format_any = formats["*"]
+        get_atoms = lambda index: index.goals
+        get_format = lambda atom: format_any
+    else:
+        lookup = "init_atoms" if section.source == "init" else "goal_atoms"
+        get_atoms = lambda index: getattr(index, lookup)(*names)
+        get_format = lambda atom: formats[atom.name.lower()]
+
+    def render(index, context):
+        sentences = [get_format(atom)(*fields(atom)) for atom in get_atoms(index) if where is None or where(atom)]
+        if not sentences:
+            return ""
+        return separator.join(sentences) + suffix
+
+    return render
+
+
+class NLTemplate:
+    """
+    The compiled natural language template of a domain.
+
+    Args:
+        sections (list): `Text` and `Atoms` sections, rendered in order.
+    """
+
+    def __init__(self, sections: list):
+        self.sections = sections
+        self.renderers = [compile_text(s) if isinstance(s, Text) else compile_atoms(s) for s in sections]
+
+    def render(self, index, context: dict) -> str:
+        """Renders a problem from its `PredicateIndex` and the domain's context values."""
+        return "".join([render(index, context) for render in self.renderers])
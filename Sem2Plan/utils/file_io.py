@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# mkstemp creates files as 0600, give them the permissions a plain open() would
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write_file(file_path: str, content):
+    """
+    Writes `content` (str, or bytes for binary files) to `file_path` through a temporary file in the same directory
+    followed by a rename, so readers (and interrupted runs) never see a partial file.
+    """
+    file_dir = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=file_dir, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,39 @@
+"""
+Canonical forms and hashes of PDDL problems, used to detect problems that only
+differ in atom order, whitespace or problem name.
+"""
+
+import hashlib
+from pddl.logic.base import And
+from pddl.core import Problem
+
+
+def get_goal_atoms(problem: Problem):
+    return list(problem.goal.operands if isinstance(problem.goal, And) else [problem.goal])
+
+
+def canonical_problem_str(problem: Problem) -> str:
+    """
+    Builds an order-independent string of the problem: domain name, sorted typed
+    objects, sorted init atoms and sorted goal atoms. The problem name is left out
+    on purpose, as generators stamp it with their seed.
+    """
+    objects = sorted(f"{obj.name} - {obj.type_tag}" for obj in problem.objects)
+    init = sorted(str(atom) for atom in problem.init)
+    goal = sorted(str(atom) for atom in get_goal_atoms(problem))
+
+    return "\n".join([
+        f"(:domain {problem.domain_name})",
+        f"(:objects {' '.join(objects)})",
+        f"(:init {' '.join(init)})",
+        f"(:goal {' '.join(goal)})",
+    ])
+
+
+def get_content_hash(content: str) -> str:
+    """Hash of the exact text of a file."""
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+def canonical_problem_hash(problem: Problem) -> str:
+    return hashlib.md5(canonical_problem_str(problem).encode()).hexdigest()
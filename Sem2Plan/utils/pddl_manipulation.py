@@ -1,155 +1,493 @@
 # This file will manipulate pddl problems to get hard negatives examples.
+import hashlib
 import os
-from copy import deepcopy
+import warnings
+from bisect import bisect_left
+from functools import cached_property
+from typing import NamedTuple
 import numpy as np
+from pddl.formatter import print_constants
 from pddl.logic.base import And, Not
 from pddl.parser.problem import ProblemParser
 from pddl.core import Problem
 
 
 MANIPULATION_TYPE_CONSTANT_LST = ["swap", "negate", "remove"]
+SWAP, NEGATE, REMOVE = range(len(MANIPULATION_TYPE_CONSTANT_LST))
+NO_MANIPULATION = -1
+# order of the atoms the plan indices refer to (see `get_state_lists`), stored with edit scripts;
+# change it whenever that order changes, so edit scripts of the old order are not rendered against the new one
+STATE_ORDER = "init-sorted-by-text/goal-operands"
 
 
-def get_manipulated_problem_list(problem, manipulated_problem_num, pollution_cap=2):
+class ManipulationPlan(NamedTuple):
+    """
+    The manipulations of a batch of negatives, one row per negative and one
+    column per manipulation (at most `pollution_cap`), in the order they are applied.
+
+    - ops: manipulation type (SWAP, NEGATE, REMOVE), NO_MANIPULATION once a negative is done.
+    - init_idx: index in the initial state of the atom the manipulation takes, -1 if none.
+    - goal_idx: index in the goal state of the atom the manipulation takes, -1 if none.
+
+    A swap takes an atom of each state, a negate or remove takes one of either.
+    """
+    ops: np.ndarray
+    init_idx: np.ndarray
+    goal_idx: np.ndarray
+
+
+def to_edit_script(ops, init_idx, goal_idx) -> list:
+    """
+    Compact form of a plan row for storage: one [op, init index, goal index]
+    triple per manipulation applied, indices into the state lists of the base
+    problem (see `get_state_lists`).
+    """
+    return [[int(op), int(i), int(g)] for op, i, g in zip(ops, init_idx, goal_idx) if op != NO_MANIPULATION]
+
+
+def from_edit_script(script) -> tuple:
+    """The (ops, init_idx, goal_idx) plan row of an edit script (see `to_edit_script`)."""
+    row = np.array(script, dtype=np.int32).reshape(-1, 3)
+    return row[:, 0], row[:, 1], row[:, 2]
+
+
+def get_stream_key(part) -> int:
+    """Spawn key word of a stream key part: ints as they are, anything else by the md5 of its text."""
+    if isinstance(part, (int, np.integer)):
+        return int(part)
+    return int.from_bytes(hashlib.md5(str(part).encode()).digest()[:8], "little")
+
+
+def get_manipulation_rng(seed, *key) -> np.random.Generator:
+    """
+    Independent `numpy.random.Generator` of the negatives of one key, e.g.
+    (domain, problem_id, entry): the child of `SeedSequence(seed)` spawned at
+    that key. It only depends on `seed` and the key, so any process can draw
+    the negatives of any key again, bit-exactly and in any order.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=tuple(map(get_stream_key, key))))
+
+
+def get_state_lists(problem):
+    """
+    The initial and goal state atoms of a problem, in the order the plan indices refer to.
+    `problem.init` is a set, whose order changes with how the problem was built (e.g. parsed
+    or unpickled), so the initial state is sorted by atom text, the order `Problem.__str__` prints.
+    """
+    return sorted(problem.init, key=str), list(problem.goal.operands if isinstance(problem.goal, And) else [problem.goal])
+
+
+def pick_remaining(num_left, taken_idx, rng):
+    """
+    Picks one of the atoms not taken yet per negative, uniformly, and returns
+    its index in the full state. `taken_idx` holds the indices already taken (-1 if none).
+    """
+    idx = (rng.random(len(num_left)) * num_left).astype(np.int64)
+    # the k-th remaining atom comes after every taken atom that precedes it
+    for taken in np.sort(np.where(taken_idx < 0, np.iinfo(taken_idx.dtype).max, taken_idx), axis=1).T:
+        idx += idx >= taken
+    return idx
+
+
+def plan_manipulations(num_init, num_goal, manipulated_problem_num, pollution_cap=2, rng=np.random):
+    """
+    Draws the manipulations of `manipulated_problem_num` negatives at once.
+
+    Each negative gets 1 to `pollution_cap` manipulations. Each one picks a
+    type uniformly among the ones that can still be applied, then the atoms it
+    takes uniformly among the atoms no earlier manipulation took:
+    - Swap: needs an atom left in both states.
+    - Negate: needs an atom left in either state, picks the state at random.
+    - Remove: never empties a state, needs two atoms left in either state.
+    A negative stops early once no type can be applied.
+
+    Parameters:
+    - num_init, num_goal: number of atoms in the initial and goal states.
+    - rng: `numpy.random` or a `numpy.random.Generator`.
+
+    Returns:
+    - ManipulationPlan of shape (manipulated_problem_num, pollution_cap).
+    """
+    n = manipulated_problem_num
+    shape = (n, pollution_cap)
+    ops = np.full(shape, NO_MANIPULATION, dtype=np.int8)
+    init_idx = np.full(shape, -1, dtype=np.int32)
+    goal_idx = np.full(shape, -1, dtype=np.int32)
+
+    num_manipulations = (rng.random(n) * pollution_cap).astype(np.int64) + 1
+    init_left = np.full(n, num_init, dtype=np.int64)
+    goal_left = np.full(n, num_goal, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+
+    for step in range(pollution_cap):
+        feasible = np.stack([
+            (init_left > 0) & (goal_left > 0),  # swap
+            (init_left > 0) | (goal_left > 0),  # negate
+            (init_left > 1) | (goal_left > 1),  # remove
+        ], axis=1)
+        num_feasible = feasible.sum(axis=1)
+        active &= (step < num_manipulations) & (num_feasible > 0)
+
+        # uniform choice among the feasible types
+        choice = (rng.random(n) * num_feasible).astype(np.int64)
+        op = np.argmax(np.cumsum(feasible, axis=1) > choice[:, None], axis=1)
+
+        # state a negate or remove applies to, forced when only one state allows it
+        on_goal = rng.random(n) < 0.5
+        negate_goal = np.where(init_left == 0, True, np.where(goal_left == 0, False, on_goal))
+        remove_goal = np.where(init_left <= 1, True, np.where(goal_left <= 1, False, on_goal))
+        single_goal = np.where(op == NEGATE, negate_goal, remove_goal)
+
+        takes_init = active & ((op == SWAP) | ~single_goal)
+        takes_goal = active & ((op == SWAP) | single_goal)
+
+        step_init = pick_remaining(np.maximum(init_left, 1), init_idx[:, :step], rng)
+        step_goal = pick_remaining(np.maximum(goal_left, 1), goal_idx[:, :step], rng)
+        init_idx[takes_init, step] = step_init[takes_init]
+        goal_idx[takes_goal, step] = step_goal[takes_goal]
+        ops[active, step] = op[active]
+
+        init_left -= takes_init
+        goal_left -= takes_goal
+
+    return ManipulationPlan(ops, init_idx, goal_idx)
+
+
+def negate(atom):
+    return atom.argument if isinstance(atom, Not) else Not(atom)
+
+
+def manipulate_states(init_state, goal_state, ops, init_idx, goal_idx):
+    """
+    Applies one row of a `ManipulationPlan` to the state lists. Manipulated
+    atoms come first, followed by the untouched atoms in their original order.
+
+    Returns:
+    - (updated_init_state, updated_goal_state)
+    """
+    updated_init_state = []
+    updated_goal_state = []
+
+    for op, i, g in zip(ops, init_idx, goal_idx):
+        if op == SWAP:
+            updated_init_state.append(goal_state[g])
+            updated_goal_state.append(init_state[i])
+        elif op == NEGATE and i >= 0:
+            updated_init_state.append(negate(init_state[i]))
+        elif op == NEGATE:
+            updated_goal_state.append(negate(goal_state[g]))
+
+    taken_init, taken_goal = set(init_idx.tolist()), set(goal_idx.tolist())
+    updated_init_state.extend(atom for k, atom in enumerate(init_state) if k not in taken_init)
+    updated_goal_state.extend(atom for k, atom in enumerate(goal_state) if k not in taken_goal)
+    return updated_init_state, updated_goal_state
+
+
+def describe_manipulations(init_state, goal_state, ops, init_idx, goal_idx) -> str:
+    """One line per manipulation of a row of a `ManipulationPlan`."""
+    manip_detail_str = ""
+    for op, i, g in zip(ops, init_idx, goal_idx):
+        if op == SWAP:
+            manip_detail_str += f"swap {init_state[i]} with {goal_state[g]}\n"
+        elif op == NEGATE and i >= 0:
+            manip_detail_str += f"negate {init_state[i]} in initial state\n"
+        elif op == NEGATE:
+            manip_detail_str += f"negate {goal_state[g]} in goal state\n"
+        elif op == REMOVE and i >= 0:
+            manip_detail_str += f"remove {init_state[i]} from initial state\n"
+        elif op == REMOVE:
+            manip_detail_str += f"remove {goal_state[g]} from goal state\n"
+    return manip_detail_str
+
+
+def apply_manipulations(problem, init_state, goal_state, ops, init_idx, goal_idx):
+    """
+    Builds the negative of one row of a `ManipulationPlan`.
+
+    Returns:
+    - (manipulated_problem, manipulation_details)
+    """
+    updated_init_state, updated_goal_state = manipulate_states(init_state, goal_state, ops, init_idx, goal_idx)
+
+    manip_problem = Problem(
+        name=problem.name,
+        domain_name=problem.domain_name,
+        objects=problem.objects,
+        init=updated_init_state,  # New mutated initial state
+        goal=And(*updated_goal_state) if len(updated_goal_state) > 1 else updated_goal_state[0],
+    )
+    return manip_problem, describe_manipulations(init_state, goal_state, ops, init_idx, goal_idx)
+
+
+class ProblemFragments:
+    """
+    The text of a base problem cut into pre-formatted pieces: the header (name,
+    domain and objects) and each init and goal atom, negated or not. The text
+    of a negative is assembled from them by joins, identical to `Problem.__str__`
+    of the built negative (which has no requirements or metric), without
+    building it. The pieces are formatted on first use.
+
+    Args:
+        init_state, goal_state (list): the atoms the plan indices refer to (see `get_state_lists`).
+    """
+
+    def __init__(self, problem, init_state, goal_state):
+        self.problem = problem
+        self.init_state = init_state
+        self.goal_state = goal_state
+
+    @cached_property
+    def header(self) -> str:
+        header = f"(define (problem {self.problem.name})\n    (:domain {self.problem.domain_name})\n"
+        if self.problem.objects:
+            header += "    " + print_constants("(:objects", self.problem.objects, ")") + "\n"
+        return header
+
+    @cached_property
+    def init_strs(self) -> list:
+        return [str(atom) for atom in self.init_state]
+
+    @cached_property
+    def goal_strs(self) -> list:
+        return [str(atom) for atom in self.goal_state]
+
+    @cached_property
+    def sorted_init_strs(self) -> list:
+        """The init atoms in the order `Problem.__str__` prints them."""
+        return sorted(self.init_strs)
+
+    @cached_property
+    def init_ranks(self) -> list:
+        """Position of each init atom in `sorted_init_strs`."""
+        ranks = [0] * len(self.init_strs)
+        for rank, k in enumerate(sorted(range(len(self.init_strs)), key=self.init_strs.__getitem__)):
+            ranks[k] = rank
+        return ranks
+
+    @cached_property
+    def init_str_set(self) -> set:
+        return set(self.init_strs)
+
+    @cached_property
+    def goal_str_set(self) -> set:
+        return set(self.goal_strs)
+
+    def get_added_atoms(self, ops, init_idx, goal_idx):
+        """Texts of the atoms a row of a `ManipulationPlan` puts in the initial and goal states."""
+        added_init, added_goal = [], []
+        for op, i, g in zip(ops, init_idx, goal_idx):
+            if op == SWAP:
+                added_init.append(self.goal_strs[g])
+                added_goal.append(self.init_strs[i])
+            elif op == NEGATE and i >= 0:
+                added_init.append(str(negate(self.init_state[i])))
+            elif op == NEGATE:
+                added_goal.append(str(negate(self.goal_state[g])))
+        return added_init, added_goal
+
+    def get_canonical_delta(self, ops, init_idx, goal_idx) -> tuple:
+        """
+        Order-independent difference between the negative of a plan row and the
+        base problem: (init atoms removed, init atoms added, goal atoms removed,
+        goal atoms added). Two negatives are the same problem if and only if
+        their deltas are equal, and a negative is the base problem itself if
+        its delta is empty.
+        """
+        added_init, added_goal = map(set, self.get_added_atoms(ops, init_idx, goal_idx))
+        taken_init = {self.init_strs[i] for i in init_idx if i >= 0}
+        taken_goal = {self.goal_strs[g] for g in goal_idx if g >= 0}
+        return (
+            frozenset(taken_init - added_init), frozenset(added_init - self.init_str_set),
+            frozenset(taken_goal - added_goal), frozenset(added_goal - self.goal_str_set),
+        )
+
+    def render(self, ops, init_idx, goal_idx) -> str:
+        """Text of the negative of one row of a `ManipulationPlan`."""
+        added_init, added_goal = self.get_added_atoms(ops, init_idx, goal_idx)
+
+        # init atoms form a set printed in sorted order: drop the taken atoms
+        # from the sorted base atoms and insert the new ones in place
+        init = list(self.sorted_init_strs)
+        for rank in sorted((self.init_ranks[i] for i in set(init_idx.tolist()) if i >= 0), reverse=True):
+            del init[rank]
+        for atom in added_init:
+            position = bisect_left(init, atom)
+            if position == len(init) or init[position] != atom:
+                init.insert(position, atom)
+
+        # goal atoms keep their order, `And` drops repeated atoms and unwraps a single one
+        taken_goal = set(goal_idx.tolist())
+        goal = added_goal + [atom for k, atom in enumerate(self.goal_strs) if k not in taken_goal]
+        if len(goal) > 1:
+            goal = list(dict.fromkeys(goal))
+        goal_str = f"(and {' '.join(goal)})" if len(goal) > 1 else goal[0]
+
+        return f"{self.header}    (:init {' '.join(init)})\n    (:goal {goal_str})\n)"
+
+
+class ManipulatedProblems:
+    """
+    The negatives of a base problem, kept as their edits: a `ManipulationPlan`
+    (op codes and atom indices, a few bytes per negative) against the state
+    lists of the base problem, which all negatives share. A negative is only
+    built into a `Problem` when it is accessed.
+
+    Indexing returns the `Problem` of a negative, slicing returns a
+    `ManipulatedProblems` view on the same base problem. `get_text` renders a
+    negative straight from the base problem's `ProblemFragments`.
+
+    Attributes:
+        problem: the base problem.
+        plan (ManipulationPlan): one row per negative.
+        init_state, goal_state (list): the atoms the plan indices refer to (see `get_state_lists`).
+        fragments (ProblemFragments): shared by all views on the base problem.
+    """
+
+    def __init__(self, problem, plan: ManipulationPlan, init_state=None, goal_state=None, fragments=None):
+        self.problem = problem
+        self.plan = plan
+        if init_state is None:
+            init_state, goal_state = get_state_lists(problem)
+        self.init_state = init_state
+        self.goal_state = goal_state
+        self.fragments = fragments or ProblemFragments(problem, init_state, goal_state)
+
+    def __len__(self):
+        return len(self.plan.ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            plan = ManipulationPlan(*(column[index] for column in self.plan))
+            return ManipulatedProblems(self.problem, plan, self.init_state, self.goal_state, self.fragments)
+        return apply_manipulations(self.problem, self.init_state, self.goal_state, *self.get_row(index))[0]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_row(self, index) -> tuple:
+        """(ops, init_idx, goal_idx) of a negative."""
+        return tuple(column[index] for column in self.plan)
+
+    def get_details(self, index) -> str:
+        return describe_manipulations(self.init_state, self.goal_state, *self.get_row(index))
+
+    def get_edit_script(self, index) -> list:
+        """Edits of a negative in storable form (see `to_edit_script`)."""
+        return to_edit_script(*self.get_row(index))
+
+    def get_text(self, index) -> str:
+        """Same as `Problem.__str__(self[index])`."""
+        return self.fragments.render(*self.get_row(index))
+
+    def get_texts(self) -> list:
+        return [self.get_text(index) for index in range(len(self))]
+
+
+def plan_unique_manipulations(fragments: ProblemFragments, manipulated_problem_num, pollution_cap=2, rng=np.random,
+                              max_rounds=100):
+    """
+    Draws manipulations like `plan_manipulations`, but rejects the negatives
+    that are the same problem as an earlier one or as the base problem itself
+    (see `ProblemFragments.get_canonical_delta`) and draws again for them
+    until `manipulated_problem_num` distinct negatives are found.
+
+    A small problem can have fewer distinct negatives than requested. If they
+    are not all found after `max_rounds` draws, a warning is emitted and the
+    plan is filled up by repeating the distinct negatives found.
+
+    Returns:
+    - (plan, stats) where stats counts the negatives "drawn", rejected as
+      "duplicates", rejected as "positive_matches" and repeated to fill the plan ("filled").
+    """
+    num_init, num_goal = len(fragments.init_state), len(fragments.goal_state)
+    stats = {"drawn": 0, "duplicates": 0, "positive_matches": 0, "filled": 0}
+    seen = set()
+    kept_plans, num_kept = [], 0
+
+    for _ in range(max_rounds):
+        plan = plan_manipulations(num_init, num_goal, manipulated_problem_num - num_kept, pollution_cap, rng)
+        keep = []
+        for k, row in enumerate(zip(*plan)):
+            delta = fragments.get_canonical_delta(*row)
+            if not any(delta):
+                stats["positive_matches"] += 1
+            elif delta in seen:
+                stats["duplicates"] += 1
+            else:
+                seen.add(delta)
+                keep.append(k)
+        stats["drawn"] += len(plan.ops)
+        kept_plans.append(ManipulationPlan(*(column[keep] for column in plan)))
+        num_kept += len(keep)
+        if num_kept == manipulated_problem_num:
+            break
+
+    plan = ManipulationPlan(*(np.concatenate(columns) for columns in zip(*kept_plans)))
+    if num_kept < manipulated_problem_num:
+        warnings.warn(f"Found {num_kept} distinct negatives of problem {fragments.problem.name} in "
+                      f"{stats['drawn']} draws, {manipulated_problem_num} requested: repeating them to fill up")
+        missing = manipulated_problem_num - num_kept
+        if num_kept > 0:
+            fill = ManipulationPlan(*(column[np.arange(missing) % num_kept] for column in plan))
+        else:
+            fill = plan_manipulations(num_init, num_goal, missing, pollution_cap, rng)  # nothing distinct to repeat
+        plan = ManipulationPlan(*(np.concatenate(columns) for columns in zip(plan, fill)))
+        stats["filled"] = missing
+    return plan, stats
+
+
+def get_manipulated_problems(problem, manipulated_problem_num, pollution_cap=2, rng=np.random,
+                             unique=False, fragments: ProblemFragments = None) -> ManipulatedProblems:
+    """
+    Same negatives as `get_manipulated_problem_list`, kept as edits of `problem`
+    (see `ManipulatedProblems`) rather than built. With `unique`, every negative
+    is a different problem and none is `problem` itself (see `plan_unique_manipulations`).
+
+    The returned negatives have a `draw_stats` dict with the number of negatives
+    drawn and rejected. Calls drawing several batches of one problem can share
+    its `fragments` instead of formatting it again.
+    """
+    if fragments is None:
+        fragments = ProblemFragments(problem, *get_state_lists(problem))
+    init_state, goal_state = fragments.init_state, fragments.goal_state
+    if unique:
+        plan, draw_stats = plan_unique_manipulations(fragments, manipulated_problem_num, pollution_cap, rng)
+    else:
+        plan = plan_manipulations(len(init_state), len(goal_state), manipulated_problem_num, pollution_cap, rng)
+        draw_stats = {"drawn": manipulated_problem_num, "duplicates": 0, "positive_matches": 0, "filled": 0}
+
+    negatives = ManipulatedProblems(problem, plan, init_state, goal_state, fragments)
+    negatives.draw_stats = draw_stats
+    return negatives
+
+
+def get_manipulated_problem_list(problem, manipulated_problem_num, pollution_cap=2, rng=np.random, unique=False):
     """
     Mutates a PDDL problem by manipulating its initial and goal states.
     - Swap: Swaps predicates between the initial and goal states.
     - Negate: Negates predicates in either the initial or goal state.
     - Remove: Removes predicates from either the initial or goal state.
-    
+
+    The manipulations of all problems are drawn at once (see `plan_manipulations`)
+    and then applied.
+
     Parameters:
     - problem: The original PDDL problem object.
     - manipulated_problem_num: Number of mutated problems to generate.
     - pollution_cap: Maximum number of manipulations per problem.
+    - rng: `numpy.random` (default) or a `numpy.random.Generator`, e.g. from `get_manipulation_rng`
+      to draw reproducibly on any worker.
+    - unique: reject duplicate negatives and negatives equal to `problem`, and draw again for them.
     
     Returns:
     - manipulated_problem_lst: List of manipulated problem objects.
     - manipulation_details_lst: List of strings detailing each manipulation.
     """
-
-    # randomly select number of manipulations for each action
-    manipulated_problem_lst = []
-    manipulation_details_lst = [] 
-    
-    for _ in range(manipulated_problem_num):
-        # randomly select the number of manipulations
-        num_manipulations = np.random.randint(1, pollution_cap + 1)
-
-        # get initial and goal state predicates
-        init_state = list(problem.init)
-        goal_state = list(problem.goal.operands if isinstance(problem.goal, And) else [problem.goal])
-        
-        updated_init_state = []
-        updated_goal_state = []
-        
-        avail_manip_type_lst = deepcopy(MANIPULATION_TYPE_CONSTANT_LST)
-        cur_manip_count = 0
-        manip_detail_str = ""
-        
-        # go through manipulations
-        while (
-            cur_manip_count < num_manipulations
-            and len(avail_manip_type_lst) > 0
-            and (len(init_state) > 0 or len(goal_state) > 0)
-        ):
-            manip_type = np.random.choice(avail_manip_type_lst)
-            
-            # SWAP
-            if manip_type == "swap":
-                if len(init_state) == 0 or len(goal_state) == 0:
-                    avail_manip_type_lst.remove("swap")
-                    continue
-                
-                swap_idx = np.random.randint(0, len(init_state))
-                swap_pred = init_state[swap_idx]
-                swap_with_idx = np.random.randint(0, len(goal_state))
-                swap_with_pred = goal_state[swap_with_idx]
-                
-                updated_init_state.append(swap_with_pred)
-                updated_goal_state.append(swap_pred)
-                
-                init_state.pop(swap_idx)
-                goal_state.pop(swap_with_idx)
-                
-                cur_manip_count += 1
-                manip_detail_str += f"swap {swap_pred} with {swap_with_pred}\n"
-                
-            # NEGATE
-            elif manip_type == "negate":
-                neg_idx = np.random.randint(0,2)
-                if len(init_state) == 0:
-                    neg_idx = 1
-                elif len(goal_state) == 0:
-                    neg_idx = 0
-                
-                if neg_idx == 0 and len(init_state) > 0:
-                    neg_idx = np.random.randint(0, len(init_state))
-                    neg_pred = init_state[neg_idx]
-                    
-                    if isinstance(neg_pred, Not):
-                        updated_init_state.append(neg_pred.argument)
-                    else:
-                        updated_init_state.append(Not(neg_pred))
-                    
-                    init_state.pop(neg_idx)
-                    cur_manip_count += 1
-                    manip_detail_str += f"negate {neg_pred} in initial state\n"
-                    
-                elif neg_idx == 1 and len(goal_state) > 0:
-                    neg_idx = np.random.randint(0, len(goal_state))
-                    neg_pred = goal_state[neg_idx]
-                    
-                    if isinstance(neg_pred, Not):
-                        updated_goal_state.append(neg_pred.argument)
-                    else:
-                        updated_goal_state.append(Not(neg_pred))
-                    
-                    goal_state.pop(neg_idx)
-                    cur_manip_count += 1
-                    manip_detail_str += f"negate {neg_pred} in goal state\n"
-                else:
-                    avail_manip_type_lst.remove("negate")
-                    continue
-            
-            # REMOVE
-            elif manip_type == "remove":
-                rem_idx = np.random.randint(0,2)
-                if len(init_state) <= 1:
-                    rem_idx = 1
-                elif len(goal_state) <= 1:
-                    rem_idx = 0
-                
-                if rem_idx == 0 and len(init_state) > 1:
-                    rem_idx = np.random.randint(0, len(init_state))
-                    manip_detail_str += f"remove {init_state[rem_idx]} from initial state\n"
-                    init_state.pop(rem_idx)
-                    cur_manip_count += 1
-                    
-                elif rem_idx == 1 and len(goal_state) > 1:
-                    rem_idx = np.random.randint(0, len(goal_state))
-                    manip_detail_str += f"remove {goal_state[rem_idx]} from goal state\n"
-                    goal_state.pop(rem_idx)
-                    cur_manip_count += 1
-                else:
-                    avail_manip_type_lst.remove("remove")
-                    continue
-        
-        updated_init_state.extend(init_state)
-        updated_goal_state.extend(goal_state)
-        
-        manip_problem = Problem(
-            name=problem.name,
-            domain_name=problem.domain_name,
-            objects=problem.objects,
-            init=updated_init_state,  # New mutated initial state
-            goal=And(*updated_goal_state) if len(updated_goal_state) > 1 else updated_goal_state[0],
-        )
-        
-        manipulated_problem_lst.append(manip_problem)
-        manipulation_details_lst.append(manip_detail_str)
-        
+    negatives = get_manipulated_problems(problem, manipulated_problem_num, pollution_cap, rng, unique)
+    manipulated_problem_lst = list(negatives)
+    manipulation_details_lst = [negatives.get_details(index) for index in range(len(negatives))]
     return manipulated_problem_lst, manipulation_details_lst
-                
 
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+"""
+Fast reader for the PDDL subset our problems are written in: typed objects,
+init atoms, goals made of atoms, `not` and `and`, and metrics on a single
+function (e.g. `(:metric minimize (total-time))`).
+
+The text is split into s-expressions with a regular expression and turned
+straight into the `pddl.core.Problem` that `ProblemParser` would build (same
+names, typed `Constant` objects shared by the init atoms, same goal order), without
+going through the Lark grammar. Anything outside the subset (numeric fluents,
+metric expressions, quantifiers, `either` types, ...) raises `UnsupportedSyntax`, and
+`read_problem` hands the text to `ProblemParser` instead.
+"""
+
+import re
+from pddl.core import Problem
+from pddl.logic.base import And, Not
+from pddl.logic.functions import Metric, NumericFunction
+from pddl.logic.predicates import Predicate
+from pddl.logic.terms import Constant
+from pddl.requirements import Requirements
+
+TOKEN_RE = re.compile(r"[()]|[^\s()]+")
+COMMENT_RE = re.compile(r";[^\n]*")
+SECTIONS = (":domain", ":requirements", ":objects", ":init", ":goal", ":metric")
+
+
+class UnsupportedSyntax(Exception):
+    """The text uses PDDL the fast reader does not handle."""
+
+
+def read_sexpr(text: str) -> list:
+    """Nested lists of tokens of the single s-expression in `text`."""
+    stack = [[]]
+    for token in TOKEN_RE.findall(COMMENT_RE.sub("", text)):
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            if len(stack) == 1:
+                raise UnsupportedSyntax("unbalanced parentheses")
+            expr = stack.pop()
+            stack[-1].append(expr)
+        else:
+            stack[-1].append(token)
+
+    if len(stack) != 1 or len(stack[0]) != 1 or not isinstance(stack[0][0], list):
+        raise UnsupportedSyntax("expected a single s-expression")
+    return stack[0][0]
+
+
+def is_symbol(expr) -> bool:
+    return isinstance(expr, str) and expr[0] not in "?:-"
+
+
+def read_objects(tokens: list) -> list:
+    """`Constant`s of a typed list of names, e.g. `b1 b2 - block t1`."""
+    objects, untyped = {}, []
+
+    def add(object_name, type_tag):
+        if object_name.lower() in objects:
+            raise UnsupportedSyntax(f"duplicate object {object_name}")
+        objects[object_name.lower()] = (object_name, type_tag)
+
+    tokens = iter(tokens)
+    for token in tokens:
+        if token == "-":
+            type_tag = next(tokens, None)
+            if not is_symbol(type_tag):
+                raise UnsupportedSyntax(f"unsupported type {type_tag}")
+            for object_name in untyped:
+                add(object_name, type_tag)
+            untyped = []
+        elif is_symbol(token):
+            untyped.append(token)
+        else:
+            raise UnsupportedSyntax(f"unsupported object {token}")
+    for object_name in untyped:
+        add(object_name, None)
+
+    return [Constant(object_name, type_tag=type_tag) for object_name, type_tag in objects.values()]
+
+
+def read_atom(expr, objects_by_name: dict) -> Predicate:
+    if not isinstance(expr, list) or not expr or not all(is_symbol(token) for token in expr):
+        raise UnsupportedSyntax(f"unsupported atom {expr}")
+
+    predicate_name, *term_names = expr
+    if predicate_name in ("=", "not", "and"):
+        raise UnsupportedSyntax(f"unsupported atom {expr}")
+    terms = [objects_by_name.get(term_name.lower()) or Constant(term_name) for term_name in term_names]
+    return Predicate(predicate_name, *terms)
+
+
+def read_literal(expr, objects_by_name: dict):
+    if isinstance(expr, list) and expr and expr[0] == "not":
+        if len(expr) != 2:
+            raise UnsupportedSyntax(f"unsupported literal {expr}")
+        return Not(read_atom(expr[1], objects_by_name))
+    return read_atom(expr, objects_by_name)
+
+
+def read_goal(expr):
+    # like `ProblemParser`, goal terms are untyped constants rather than the problem's objects
+    if isinstance(expr, list) and expr and expr[0] == "and":
+        return And(*(read_goal(operand) for operand in expr[1:]))
+    if isinstance(expr, list) and expr and expr[0] == "not":
+        if len(expr) != 2:
+            raise UnsupportedSyntax(f"unsupported goal {expr}")
+        return Not(read_goal(expr[1]))
+    return read_atom(expr, {})
+
+
+def read_metric(expr) -> Metric:
+    if len(expr) != 2 or expr[0] not in ("minimize", "maximize") or not isinstance(expr[1], list) \
+            or not expr[1] or not all(is_symbol(token) for token in expr[1]):
+        raise UnsupportedSyntax(f"unsupported metric {expr}")
+    function_name, *term_names = expr[1]
+    return Metric(NumericFunction(function_name, *(Constant(term_name) for term_name in term_names)), expr[0])
+
+
+def fast_read_problem(text: str) -> Problem:
+    """
+    Reads a problem of the supported subset.
+
+    Raises:
+    - UnsupportedSyntax: the text is not in the subset, or not a valid problem.
+    """
+    expr = read_sexpr(text)
+    if len(expr) < 3 or expr[0] != "define":
+        raise UnsupportedSyntax("expected (define (problem ...) ...)")
+
+    header, *sections = expr[1:]
+    if not isinstance(header, list) or len(header) != 2 or header[0] != "problem" or not is_symbol(header[1]):
+        raise UnsupportedSyntax("expected (problem <name>)")
+
+    keys = [section[0] if isinstance(section, list) and section else None for section in sections]
+    # sections come in the order of the grammar, requirements and objects are optional
+    if keys != [key for key in SECTIONS if key in keys] or not {":domain", ":init", ":goal"} <= set(keys):
+        raise UnsupportedSyntax(f"unsupported sections {keys}")
+    fields = {section[0]: section[1:] for section in sections}
+    if len(fields[":domain"]) != 1 or not is_symbol(fields[":domain"][0]) or len(fields[":goal"]) != 1:
+        raise UnsupportedSyntax("expected one domain name and one goal")
+
+    try:
+        objects = read_objects(fields.get(":objects", []))
+        objects_by_name = {obj.name.lower(): obj for obj in objects}
+        problem_fields = {}
+        if ":requirements" in fields:
+            problem_fields["requirements"] = {Requirements(r[1:]) for r in fields[":requirements"]}
+        if ":metric" in fields:
+            problem_fields["metric"] = read_metric(fields[":metric"])
+
+        return Problem(
+            header[1],
+            domain_name=fields[":domain"][0],
+            objects=objects,
+            init=[read_literal(atom, objects_by_name) for atom in fields[":init"]],
+            goal=read_goal(fields[":goal"][0]),
+            **problem_fields,
+        )
+    except (TypeError, ValueError, AssertionError) as e:  # e.g. invalid names
+        raise UnsupportedSyntax(str(e)) from e
+
+
+def read_problem(text: str, get_parser) -> Problem:
+    """
+    Reads `text` with the fast reader, or with the `ProblemParser` returned by
+    `get_parser()` if it is outside the subset. The parser is only built when needed.
+    """
+    try:
+        return fast_read_problem(text)
+    except UnsupportedSyntax:
+        return get_parser()(text)
@@ -0,0 +1,105 @@
+"""
+Parsing of PDDL problems shared by the pipeline stages (generation, conversion
+and the training dataset).
+
+Problems are read with the fast reader of `pddl_reader`, which falls back to
+`ProblemParser` on anything outside the PDDL subset we generate. Building a
+`ProblemParser` compiles its Lark grammar, which costs far more than parsing a
+single problem, so every thread keeps one parser (`get_problem_parser`). The
+parser keeps state while parsing, so threads cannot share one.
+
+`ParsedProblemCache` keeps the parsed `Problem` of every problem text on disk,
+pickled under the hash of the text. A stage that parses a problem another stage
+(or an earlier run) already parsed loads it back without going through Lark.
+"""
+
+import os
+import pickle
+import threading
+import pddl
+from pddl.core import Problem
+from pddl.parser.problem import ProblemParser
+from .file_io import atomic_write_file
+from .pddl_hashing import get_content_hash
+from .pddl_reader import read_problem
+
+PARSED_CACHE_DIR_NAME = "parsed_cache"
+
+thread_state = threading.local()
+
+
+def get_problem_parser() -> ProblemParser:
+    """
+    The `ProblemParser` of this thread, built on first use. Its transformer keeps
+    per-parse state (e.g. the objects by name), so it must not be shared by
+    threads parsing at the same time, like the default executor of `iter_job_results`.
+    """
+    parser = getattr(thread_state, "problem_parser", None)
+    if parser is None:
+        parser = thread_state.problem_parser = ProblemParser()
+    return parser
+
+
+def parse_problem(problem_str: str, fast_reader: bool = True) -> Problem:
+    """Parses a problem with the fast reader (unless `fast_reader` is False) or this thread's `ProblemParser`."""
+    if fast_reader:
+        return read_problem(problem_str, get_problem_parser)
+    return get_problem_parser()(problem_str)
+
+
+def get_default_cache_dir(dataset_dir: str) -> str:
+    """The cache lives next to the domain directories, e.g. `data/01_raw_dataset/training/parsed_cache`."""
+    return os.path.join(os.path.dirname(os.path.normpath(dataset_dir)), PARSED_CACHE_DIR_NAME)
+
+
+class ParsedProblemCache:
+    """
+    On-disk cache of parsed problems, content addressed: the `Problem` parsed from
+    a text is stored in `cache_dir/pddl-<version>/<hash[:2]>/<hash>.pkl`, where
+    `hash` is the md5 of the text. Entries are written atomically, so processes
+    can share a cache directory. Entries pickled by another version of `pddl`
+    are not used.
+
+    The cache only holds a path, so it can be sent to worker processes.
+
+    Args:
+        cache_dir (str): directory of the cache, created on first write.
+        fast_reader (bool): parse missing problems with the fast reader (see `parse_problem`).
+    """
+
+    def __init__(self, cache_dir: str, fast_reader: bool = True):
+        self.cache_dir = cache_dir
+        self.fast_reader = fast_reader
+        self.version_dir = os.path.join(cache_dir, f"pddl-{pddl.__version__}")
+
+    def get_path(self, problem_hash: str) -> str:
+        return os.path.join(self.version_dir, problem_hash[:2], f"{problem_hash}.pkl")
+
+    def get(self, problem_str: str):
+        """Returns the cached `Problem` parsed from `problem_str`, or None."""
+        try:
+            with open(self.get_path(get_content_hash(problem_str)), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None  # unreadable entry, parsed and written again
+
+    def put(self, problem_str: str, problem: Problem):
+        """Caches `problem` as the parse of `problem_str`."""
+        path = self.get_path(get_content_hash(problem_str))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_file(path, pickle.dumps(problem, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def parse(self, problem_str: str) -> Problem:
+        """Parses `problem_str`, or loads its parse from the cache."""
+        problem = self.get(problem_str)
+        if problem is None:
+            problem = parse_problem(problem_str, self.fast_reader)
+            self.put(problem_str, problem)
+        return problem
+
+
+def parse_problem_cached(problem_str: str, cache: ParsedProblemCache = None) -> Problem:
+    """Parses `problem_str` through `cache`, or with `parse_problem` if there is no cache."""
+    return cache.parse(problem_str) if cache is not None else parse_problem(problem_str)
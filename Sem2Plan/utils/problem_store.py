@@ -0,0 +1,229 @@
+"""
+Storage backends for the raw problems of a domain dataset (`positive.pddl`,
+`anchor.nl` and any extra file of a problem).
+
+Two backends share the same interface:
+    - DirectoryProblemStore: the original layout, one `problems/pNN/` directory
+      per problem with one file per entry.
+    - PackedProblemStore: entries are appended to a few large shard files in
+      `shards/`, and `shards/index.jsonl` records where each entry lives. This
+      keeps the number of files (and metadata operations) constant no matter
+      how many problems a dataset holds.
+
+`open_problem_store` picks the backend of an existing dataset, so writers and
+readers do not need to know which one is in use.
+"""
+
+import glob
+import json
+import os
+from .file_io import atomic_write_file
+
+PROBLEMS_DIR_NAME = "problems"
+SHARDS_DIR_NAME = "shards"
+SHARD_INDEX_FILE_NAME = "index.jsonl"
+POSITIVE_FILE_NAME = "positive.pddl"
+ANCHOR_FILE_NAME = "anchor.nl"
+
+
+def sort_problem_ids(problem_ids) -> list:
+    """Sorts `pNN` ids by number, so p100 comes after p99."""
+    return sorted(problem_ids, key=lambda problem_id: (len(problem_id), problem_id))
+
+
+class DirectoryProblemStore:
+    """
+    One directory per problem: `dataset_dir/problems/<problem_id>/<file_name>`.
+    """
+
+    packed = False
+
+    def __init__(self, dataset_dir: str):
+        self.dataset_dir = dataset_dir
+        self.problem_dir = os.path.join(dataset_dir, PROBLEMS_DIR_NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def get_path(self, problem_id: str, file_name: str) -> str:
+        return os.path.join(self.problem_dir, problem_id, file_name)
+
+    def write(self, problem_id: str, file_name: str, content: str):
+        """Writes an entry through a temporary file and a rename."""
+        path = self.get_path(problem_id, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_file(path, content)
+
+    def read(self, problem_id: str, file_name: str) -> str:
+        with open(self.get_path(problem_id, file_name), "r") as f:
+            return f.read()
+
+    def contains(self, problem_id: str, file_name: str) -> bool:
+        return os.path.exists(self.get_path(problem_id, file_name))
+
+    def problem_ids(self) -> list:
+        """Ids of the complete problems, i.e. the ones that have a `positive.pddl`."""
+        positive_paths = glob.glob(os.path.join(self.problem_dir, "p*", POSITIVE_FILE_NAME))
+        return sort_problem_ids(os.path.basename(os.path.dirname(path)) for path in positive_paths)
+
+
+class PackedProblemStore:
+    """
+    Problems packed into append-only shard files.
+
+    Each entry is appended to the current shard (`shards/shard-NNNNN.dat`) and
+    then recorded in `shards/index.jsonl` with its shard, offset and length. A
+    new shard is started once the current one reaches `max_shard_size` bytes.
+    Rewriting an entry appends a new copy, and the last record of an entry
+    wins. Records whose data is missing (run killed mid-write) and a cut last
+    index line are ignored. Opening the store only reads, so read-only datasets
+    can be opened: the shard directory is created and a cut index line is
+    dropped when the first entry is written.
+
+    Args:
+        max_shard_size (int): size in bytes after which a new shard is started.
+    """
+
+    packed = True
+
+    def __init__(self, dataset_dir: str, max_shard_size: int = 1 << 30):
+        self.dataset_dir = dataset_dir
+        self.shard_dir = os.path.join(dataset_dir, SHARDS_DIR_NAME)
+        self.index_path = os.path.join(self.shard_dir, SHARD_INDEX_FILE_NAME)
+        self.max_shard_size = max_shard_size
+        self.entries = {}  # (problem_id, file_name) -> (shard, offset, length)
+        self._read_fds = {}
+        self._shard_file = None
+        self._index_file = None
+        self._index_size = 0  # bytes of complete index lines
+
+        self.num_shards = len(glob.glob(os.path.join(self.shard_dir, "shard-*.dat")))
+        self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        # open files stay with the process that opened them
+        state = self.__dict__.copy()
+        state.update(_read_fds={}, _shard_file=None, _index_file=None)
+        return state
+
+    def get_shard_path(self, shard: int) -> str:
+        return os.path.join(self.shard_dir, f"shard-{shard:05d}.dat")
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+
+        shard_sizes = {shard: os.path.getsize(self.get_shard_path(shard)) for shard in range(self.num_shards)}
+        with open(self.index_path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # last line was cut by a kill, or is still being written
+                self._index_size += len(line.encode())
+                record = json.loads(line)
+                if record["offset"] + record["length"] > shard_sizes.get(record["shard"], 0):
+                    continue
+                self.entries[(record["id"], record["file"])] = (record["shard"], record["offset"], record["length"])
+
+    def _open_writer(self, num_bytes: int):
+        if self._shard_file is None:
+            os.makedirs(self.shard_dir, exist_ok=True)
+            if os.path.exists(self.index_path) and os.path.getsize(self.index_path) != self._index_size:
+                # drop a cut last line so new records start on a fresh line
+                os.truncate(self.index_path, self._index_size)
+            self._shard = max(self.num_shards - 1, 0)
+            self._shard_file = open(self.get_shard_path(self._shard), "ab")
+            self._index_file = open(self.index_path, "a")
+
+        shard_size = self._shard_file.tell()
+        if shard_size > 0 and shard_size + num_bytes > self.max_shard_size:
+            self._shard_file.close()
+            self._shard += 1
+            self._shard_file = open(self.get_shard_path(self._shard), "ab")
+
+        self.num_shards = max(self.num_shards, self._shard + 1)
+
+    def write(self, problem_id: str, file_name: str, content: str):
+        data = content.encode()
+        self._open_writer(len(data))
+
+        offset = self._shard_file.tell()
+        self._shard_file.write(data)
+        self._shard_file.flush()  # the data has to reach the shard before its index record
+
+        self._index_file.write(json.dumps({
+            "id": problem_id, "file": file_name, "shard": self._shard, "offset": offset, "length": len(data),
+        }) + "\n")
+        self._index_file.flush()
+
+        self.entries[(problem_id, file_name)] = (self._shard, offset, len(data))
+
+    def read(self, problem_id: str, file_name: str) -> str:
+        try:
+            shard, offset, length = self.entries[(problem_id, file_name)]
+        except KeyError:
+            raise FileNotFoundError(f"{problem_id}/{file_name} is not in {self.shard_dir}") from None
+
+        if shard not in self._read_fds:
+            self._read_fds[shard] = os.open(self.get_shard_path(shard), os.O_RDONLY)
+        return os.pread(self._read_fds[shard], length, offset).decode()
+
+    def contains(self, problem_id: str, file_name: str) -> bool:
+        return (problem_id, file_name) in self.entries
+
+    def problem_ids(self) -> list:
+        """Ids of the complete problems, i.e. the ones that have a `positive.pddl`."""
+        return sort_problem_ids(problem_id for problem_id, file_name in self.entries if file_name == POSITIVE_FILE_NAME)
+
+    def close(self):
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds = {}
+        for f in (self._shard_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._shard_file = self._index_file = None
+
+
+def is_packed_dataset(dataset_dir: str) -> bool:
+    return os.path.isdir(os.path.join(dataset_dir, SHARDS_DIR_NAME))
+
+
+def open_problem_store(dataset_dir: str, packed: bool = False):
+    """
+    Opens the problem store of a domain dataset directory. `packed` selects the
+    backend of a new dataset, an existing dataset keeps the one it was written with.
+    """
+    if is_packed_dataset(dataset_dir):
+        packed = True
+    elif os.path.isdir(os.path.join(dataset_dir, PROBLEMS_DIR_NAME)):
+        packed = False
+    return PackedProblemStore(dataset_dir) if packed else DirectoryProblemStore(dataset_dir)
+
+
+def list_dataset_dirs(root_dir: str) -> list:
+    """The domain dataset directories of `root_dir`, i.e. the ones holding problems in either layout."""
+    return [
+        dataset_dir for dataset_dir in sorted(glob.glob(os.path.join(root_dir, "*")))
+        if is_packed_dataset(dataset_dir) or os.path.isdir(os.path.join(dataset_dir, PROBLEMS_DIR_NAME))
+    ]
+
+
+def open_dataset_stores(root_dir: str) -> dict:
+    """
+    Opens the problem store of every domain dataset in `root_dir` (e.g.
+    `data/01_raw_dataset/training`), keyed by domain directory name, so
+    problems can be accessed by (domain, problem id).
+    """
+    return {os.path.basename(dataset_dir): open_problem_store(dataset_dir) for dataset_dir in list_dataset_dirs(root_dir)}
@@ -0,0 +1,71 @@
+"""
+Stage-level timing for the dataset pipelines.
+
+A `StageTimer` collects latency samples per stage (e.g. "generator", "parse",
+"dedupe", "write") and plain counters for one domain. At the end of a run it
+prints a summary table (count, total, p50/p95/p99) and writes the same numbers
+as a JSON report.
+"""
+
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+import numpy as np
+from tabulate import tabulate
+from .file_io import atomic_write_file
+
+
+def timed_call(fn, *args):
+    """Calls `fn(*args)` and returns `(result, seconds)`. Picklable, so it can time work on worker processes."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class StageTimer:
+    def __init__(self, name: str):
+        self.name = name
+        self.samples = defaultdict(list)
+        self.counters = defaultdict(int)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def count(self, counter: str, n: int = 1):
+        self.counters[counter] += n
+
+    def summary(self) -> dict:
+        stages = {}
+        for stage, samples in self.samples.items():
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            stages[stage] = {
+                "count": len(samples),
+                "total": float(np.sum(samples)),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+            }
+        return {"name": self.name, "stages": stages, "counters": dict(self.counters)}
+
+    def print_summary(self):
+        summary = self.summary()
+        rows = [
+            [stage, s["count"], f"{s['total']:.3f}", f"{s['p50'] * 1e3:.2f}", f"{s['p95'] * 1e3:.2f}", f"{s['p99'] * 1e3:.2f}"]
+            for stage, s in summary["stages"].items()
+        ]
+        print(f"\n{self.name} timings")
+        print(tabulate(rows, headers=["stage", "count", "total (s)", "p50 (ms)", "p95 (ms)", "p99 (ms)"]))
+        if summary["counters"]:
+            print(", ".join(f"{k}: {v}" for k, v in summary["counters"].items()))
+
+    def write_report(self, report_path: str):
+        atomic_write_file(report_path, json.dumps(self.summary(), indent=2))
@@ -12,10 +12,11 @@ def run_convert_pddl_example():
     parser = argparse.ArgumentParser(description="Blocksworld Problem Converter")
     parser.add_argument("--name", type=str, default="blocksworld")
     parser.add_argument("--dir_path", type=str, default="data/05_demonstration/blocksworld")
+    parser.add_argument("--num_workers", type=int, default=None)
     args = parser.parse_args()
 
     b = Blocksworld()
-    b.convert_pddl_to_nl(args.dir_path)
+    b.convert_pddl_to_nl(args.dir_path, num_workers=args.num_workers)
 
 
 if __name__ == "__main__":
@@ -17,6 +17,11 @@ def run_generate_pddl_example():
     parser.add_argument("--ops", type=int, default=4)
     parser.add_argument("--blocks", type=int, default=10)
     parser.add_argument("--max_iterations", type=int, default=3)
+    parser.add_argument("--num_workers", type=int, default=1)
+    parser.add_argument("--backend", type=str, default="subprocess", choices=["subprocess", "native"])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timing_report", type=str, default=None)
+    parser.add_argument("--storage", type=str, default="directory", choices=["directory", "packed"])
     args = parser.parse_args()
 
     b = Blocksworld()
@@ -26,4 +31,4 @@ def run_generate_pddl_example():
 if __name__ == "__main__":
     run_generate_pddl_example()
 
-    # example: python demonstrations/run_generate_pddl.py --name blocksworld --ops 4 --blocks 12 --max_iterations 10
+    # example: python demonstrations/run_generate_pddl.py --name blocksworld --ops 4 --blocks 12 --max_iterations 10 --num_workers 4
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("datasets")
+
+from Sem2Plan.pipelines.finetuning_sentence_encoder.finetune_dataset import (
+    STRING_TABLE_FILE_NAME, LRUCache, TorchDataset, read_string_table, write_string_table,
+)
+from Sem2Plan.utils.problem_store import PackedProblemStore, ANCHOR_FILE_NAME, POSITIVE_FILE_NAME
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "01_raw_dataset", "training", "blocksworld", "problems")
+NUM_ENTRIES = 20
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    with PackedProblemStore(os.path.join(tmp_path, "blocksworld")) as store:
+        for problem_id in ("p00", "p01"):
+            with open(os.path.join(CORPUS_DIR, problem_id, POSITIVE_FILE_NAME)) as f:
+                store.write(problem_id, POSITIVE_FILE_NAME, f.read())
+            store.write(problem_id, ANCHOR_FILE_NAME, f"anchor of {problem_id}")
+    return str(tmp_path)
+
+
+def test_seeded_negatives_are_distinct_within_problem(dataset_dir):
+    dataset = TorchDataset(dataset_dir, seed=0, num_entries=NUM_ENTRIES)
+    for problem_idx in range(len(dataset.positives)):
+        entries = range(problem_idx * NUM_ENTRIES, (problem_idx + 1) * NUM_ENTRIES)
+        negatives = [text for entry in entries for text in dataset.get_negatives(entry)]
+        assert len(set(negatives)) == len(negatives) == NUM_ENTRIES * dataset.problems_per_entry
+        assert dataset.positives[problem_idx] not in negatives
+
+
+def test_lazy_negatives_match_seeded(dataset_dir):
+    eager = TorchDataset(dataset_dir, seed=0, num_entries=NUM_ENTRIES)
+    lazy = TorchDataset(dataset_dir, seed=0, lazy=True, num_entries=NUM_ENTRIES)
+    for idx in reversed(range(len(eager))):  # any serving order draws the same negatives
+        assert lazy[idx] == eager[idx]
+    assert lazy.negative_stats == eager.negative_stats
+
+
+def test_lazy_negatives_are_drawn_again_after_eviction(dataset_dir):
+    eager = TorchDataset(dataset_dir, seed=0, num_entries=NUM_ENTRIES)
+    lazy = TorchDataset(dataset_dir, seed=0, lazy=True, num_entries=NUM_ENTRIES)
+    lazy.negative_plans = LRUCache(1)
+    for idx in range(NUM_ENTRIES):  # alternate between the two problems
+        for entry in (idx, NUM_ENTRIES + idx):
+            assert lazy[entry] == eager[entry]
+    assert len(lazy.negative_plans.items) == 1
+    assert lazy.negative_stats == eager.negative_stats
+
+
+def test_unseeded_negatives_fill_all_entries(dataset_dir):
+    dataset = TorchDataset(dataset_dir, estimate_batch_size=1000, num_entries=NUM_ENTRIES)
+    assert len(dataset) == 2 * NUM_ENTRIES
+    assert all(len(dataset.get_negatives(entry)) == dataset.problems_per_entry for entry in range(len(dataset)))
+
+
+def test_string_table_version_is_checked(tmp_path):
+    path = os.path.join(tmp_path, STRING_TABLE_FILE_NAME)
+    write_string_table(path, ["anchor", "positive"])
+    assert read_string_table(path, delta_negatives=True) == ["anchor", "positive"]
+
+    with open(path) as f:
+        table = json.load(f)
+    with open(path, "w") as f:
+        json.dump(dict(table, state_order="init-in-set-order"), f)
+    with pytest.raises(ValueError):
+        read_string_table(path)
+
+    with open(path, "w") as f:
+        json.dump(["anchor", "positive"], f)  # table of an older release
+    assert read_string_table(path) == ["anchor", "positive"]
+    with pytest.raises(ValueError):
+        read_string_table(path, delta_negatives=True)
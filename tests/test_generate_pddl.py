@@ -0,0 +1,99 @@
+import glob
+import json
+import os
+import shutil
+import sys
+from argparse import Namespace
+import pytest
+from Sem2Plan.pipelines.generate_dataset.checkpoint import MANIFEST_FILE_NAME
+from Sem2Plan.pipelines.generate_dataset.dedupe_index import get_default_index_path
+from Sem2Plan.pipelines.generate_dataset.generate_pddl import Domain
+from Sem2Plan.utils.problem_cache import ParsedProblemCache
+from Sem2Plan.utils.problem_store import open_problem_store, POSITIVE_FILE_NAME
+
+PROBLEM_TEMPLATE = "(define (problem bw-{0}) (:domain blocksworld) (:objects b1 b2)\n" \
+                   "  (:init (clear b{0}) (arm-empty)) (:goal (on b1 b2)))"
+
+
+class ScriptedDomain(Domain):
+    """Domain whose generator prints the problems of a fixed list, some of them duplicates."""
+
+    def __init__(self, problems):
+        self.problems = problems
+
+    def iter_jobs(self, args):
+        yield from self.problems
+
+    def build_command(self, job, work_dir: str) -> list:
+        return [sys.executable, "-c", "import sys; sys.stdout.write(sys.argv[1])", job]
+
+
+def test_generation_caches_accepted_problems_once(tmp_path):
+    problems = [PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(2)]
+    dataset_dir = os.path.join(tmp_path, "scripted")
+    ScriptedDomain(problems).generate_problem(dataset_dir, Namespace(max_iterations=2, num_workers=1))
+
+    cache = ParsedProblemCache(os.path.join(tmp_path, "parsed_cache"))
+    with open_problem_store(dataset_dir) as store:
+        positives = [store.read(problem_id, POSITIVE_FILE_NAME) for problem_id in store.problem_ids()]
+
+    # one pickle per accepted problem, under its stored text, none for the raw output or the duplicate
+    assert len(positives) == 2
+    assert len(glob.glob(os.path.join(cache.version_dir, "*", "*.pkl"))) == 2
+    assert all(cache.get(positive) is not None for positive in positives)
+    assert all(cache.get(problem) is None for problem in problems)
+
+
+def read_manifest(dataset_dir):
+    with open(os.path.join(dataset_dir, MANIFEST_FILE_NAME), "r") as f:
+        return json.load(f)
+
+
+def test_short_run_warns_and_is_recorded(tmp_path):
+    problems = [PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(2)]
+    dataset_dir = os.path.join(tmp_path, "scripted")
+    with pytest.warns(UserWarning, match="ran out of jobs: 2 of 5"):
+        ScriptedDomain(problems).generate_problem(dataset_dir, Namespace(max_iterations=5, num_workers=1))
+
+    manifest = read_manifest(dataset_dir)
+    assert manifest["num_problems"] == 2
+    assert manifest["short"]
+
+
+def test_regenerating_deleted_domain(tmp_path):
+    problems = [PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(2)]
+    dataset_dir = os.path.join(tmp_path, "scripted")
+    args = Namespace(max_iterations=2, num_workers=1)
+    ScriptedDomain(problems).generate_problem(dataset_dir, args)
+    shutil.rmtree(dataset_dir)
+
+    ScriptedDomain(problems).generate_problem(dataset_dir, args)
+
+    assert not read_manifest(dataset_dir)["short"]
+    with open_problem_store(dataset_dir) as store:
+        assert store.problem_ids() == ["p00", "p01"]
+
+
+def test_new_index_starts_from_stored_problems(tmp_path):
+    dataset_dir = os.path.join(tmp_path, "scripted")
+    ScriptedDomain([PROBLEM_TEMPLATE.format(1)]).generate_problem(dataset_dir, Namespace(max_iterations=1, num_workers=1))
+    os.remove(get_default_index_path(dataset_dir))
+
+    # a new run (other arguments) whose first job is the stored problem again, which is rejected
+    domain = ScriptedDomain([PROBLEM_TEMPLATE.format(1), PROBLEM_TEMPLATE.format(2)])
+    domain.generate_problem(dataset_dir, Namespace(max_iterations=2, num_workers=1, seed=1))
+
+    with open_problem_store(dataset_dir) as store:
+        positives = [store.read(problem_id, POSITIVE_FILE_NAME) for problem_id in store.problem_ids()]
+    assert len(positives) == 2
+    assert len(set(positives)) == 2
+
+
+def test_unparsable_output_is_recorded_as_failure(tmp_path):
+    problems = [PROBLEM_TEMPLATE.format(1), "Usage: generator <n>", PROBLEM_TEMPLATE.format(2)]
+    dataset_dir = os.path.join(tmp_path, "scripted")
+    summary = ScriptedDomain(problems).generate_problem(dataset_dir, Namespace(max_iterations=2, num_workers=1))
+
+    assert summary["failed"] == summary["parse"] == 1
+    with open_problem_store(dataset_dir) as store:
+        assert store.problem_ids() == ["p00", "p01"]
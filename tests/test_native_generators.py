@@ -0,0 +1,161 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from Sem2Plan.pipelines.generate_dataset.native_generators import (
+    generate_blocksworld_problem, generate_grippers_problem, generate_logistics_problem,
+    generate_termes_boards, generate_termes_problem,
+)
+from Sem2Plan.utils.pddl_manipulation import get_state_lists
+from Sem2Plan.utils.problem_cache import parse_problem
+
+# problems of the committed corpus were written by the pddl-generators binaries
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "01_raw_dataset", "training")
+DRAWS_PER_PROBLEM = 20
+
+
+def iter_corpus(domain: str):
+    problems_dir = os.path.join(CORPUS_DIR, domain, "problems")
+    if not os.path.isdir(problems_dir):
+        pytest.skip(f"no {domain} corpus in {CORPUS_DIR}")
+    for problem_id in sorted(os.listdir(problems_dir)):
+        yield os.path.join(problems_dir, problem_id)
+
+
+def read_corpus_problems(domain: str) -> list:
+    problems = []
+    for problem_dir in iter_corpus(domain):
+        with open(os.path.join(problem_dir, "positive.pddl")) as f:
+            problems.append(parse_problem(f.read()))
+    return problems
+
+
+def get_layout(problem) -> tuple:
+    """Everything of a problem that does not depend on the random draws."""
+    init, goal = get_state_lists(problem)
+    return (
+        problem.name,
+        problem.domain_name,
+        sorted((str(o), sorted(o.type_tags)) for o in problem.objects),
+        sorted(Counter(p.name for p in init).items()),
+        sorted(Counter(p.name for p in goal).items()),
+    )
+
+
+def get_location(atoms, name: str) -> dict:
+    return {str(a.terms[0]): str(a.terms[1]) for a in atoms if a.name == name}
+
+
+def assert_same_distribution(corpus_values, native_values):
+    """The native mean lies within 4 standard errors of the corpus mean."""
+    corpus_values, native_values = np.asarray(corpus_values, float), np.asarray(native_values, float)
+    standard_error = np.sqrt(corpus_values.var() / len(corpus_values) + native_values.var() / len(native_values))
+    assert abs(corpus_values.mean() - native_values.mean()) <= 4 * standard_error + 1e-9
+
+
+def draw_native(generate, corpus: list, get_args) -> list:
+    """`DRAWS_PER_PROBLEM` native problems with the sizes of each corpus problem, from fixed seeds."""
+    native = []
+    for i, problem in enumerate(corpus):
+        for k in range(DRAWS_PER_PROBLEM):
+            native.append(generate(np.random.default_rng([i, k]), *get_args(problem)))
+    return native
+
+
+def get_blocksworld_args(problem):
+    return len(problem.objects), int(problem.domain_name.split("-")[1].rstrip("ops"))
+
+
+def get_grippers_args(problem):
+    return tuple(int(x) for x in problem.name.split("-")[1:])
+
+
+def get_logistics_args(problem):
+    cities, city_size, packages, airplanes = re.fullmatch(r"logistics-c(\d+)-s(\d+)-p(\d+)-a(\d+)", problem.name).groups()
+    trucks = sum(1 for p in problem.init if p.name == "TRUCK")
+    return int(airplanes), int(cities), int(city_size), int(packages), trucks
+
+
+def test_blocksworld_matches_corpus():
+    corpus = read_corpus_problems("blocksworld")
+    native = draw_native(generate_blocksworld_problem, corpus, get_blocksworld_args)
+
+    def get_towers(problem):
+        init, goal = get_state_lists(problem)
+        return sum(p.name == "on-table" for p in init), len(problem.objects) - len(goal)
+
+    for problem in corpus:
+        generated = generate_blocksworld_problem(np.random.default_rng(0), *get_blocksworld_args(problem))
+        assert (generated.name, generated.domain_name) == (problem.name, problem.domain_name)
+        assert sorted(map(str, generated.objects)) == sorted(map(str, problem.objects))
+
+    for column in range(2):  # towers of the initial and of the goal state
+        assert_same_distribution([get_towers(p)[column] for p in corpus], [get_towers(p)[column] for p in native])
+
+
+def test_grippers_matches_corpus():
+    corpus = read_corpus_problems("grippers")
+    native = draw_native(generate_grippers_problem, corpus, get_grippers_args)
+
+    def get_statistics(problem):
+        init, goal = get_state_lists(problem)
+        num_rooms = get_grippers_args(problem)[1]
+        start, end = get_location(init, "at"), get_location(goal, "at")
+        robot_rooms = get_location(init, "at-robby")
+        return (
+            np.mean([start[ball] == end[ball] for ball in start]) * num_rooms,
+            np.mean([room == "room1" for room in robot_rooms.values()]) * num_rooms,
+        )
+
+    for problem in corpus:
+        generated = generate_grippers_problem(np.random.default_rng(0), *get_grippers_args(problem))
+        assert get_layout(generated) == get_layout(problem)
+
+    corpus_statistics, native_statistics = map(np.array, ([get_statistics(p) for p in corpus], [get_statistics(p) for p in native]))
+    for column in range(corpus_statistics.shape[1]):
+        assert_same_distribution(corpus_statistics[:, column], native_statistics[:, column])
+
+
+def test_logistics_matches_corpus():
+    corpus = read_corpus_problems("logistics")
+    native = draw_native(generate_logistics_problem, corpus, get_logistics_args)
+
+    def get_statistics(problem):
+        init, goal = get_state_lists(problem)
+        start, end = get_location(init, "at"), get_location(goal, "at")
+        num_cities = get_logistics_args(problem)[1]
+        packages = list(end)
+        return (
+            np.mean([start[p] == end[p] for p in packages]),
+            np.mean([start[p].split("-")[0] == end[p].split("-")[0] for p in packages]) * num_cities,
+        )
+
+    for problem in corpus:
+        generated = generate_logistics_problem(np.random.default_rng(0), *get_logistics_args(problem))
+        assert get_layout(generated) == get_layout(problem)
+        # truck i starts in city i, as long as there are cities left
+        start = get_location(generated.init, "at")
+        assert all(start[f"t{i}"].startswith(f"l{i}-") for i in range(get_logistics_args(problem)[1]))
+
+    corpus_statistics, native_statistics = map(np.array, ([get_statistics(p) for p in corpus], [get_statistics(p) for p in native]))
+    for column in range(corpus_statistics.shape[1]):
+        assert_same_distribution(corpus_statistics[:, column], native_statistics[:, column])
+
+
+def test_termes_matches_corpus():
+    for problem_dir in iter_corpus("termes"):
+        (board_name,) = [name for name in os.listdir(problem_dir) if name.startswith("random_towers_")]
+        board = np.loadtxt(os.path.join(problem_dir, board_name), dtype=np.int64, ndmin=2)
+        with open(os.path.join(problem_dir, "positive.pddl")) as f:
+            assert str(generate_termes_problem(board, board_name)) == f.read()
+
+        # the native board of the same seed has the same setting
+        size_x, size_y, height, num_towers, seed = map(int, re.findall(r"\d+", board_name))
+        (native_board,) = generate_termes_boards([seed], size_x, size_y, height, num_towers)
+        for b in (board, native_board):
+            towers = b[b > 0]
+            assert b.shape == (size_y, size_x)
+            assert len(towers) == num_towers and towers.max() == height and towers.min() >= 2
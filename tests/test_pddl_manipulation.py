@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from Sem2Plan.utils.pddl_hashing import canonical_problem_str
+from Sem2Plan.utils.pddl_manipulation import get_manipulated_problems
+from Sem2Plan.utils.problem_cache import parse_problem
+
+SMALL_PROBLEM = """(define (problem BW-rand-2)
+    (:domain blocksworld-4ops)
+    (:objects b1 b2)
+    (:init (arm-empty) (clear b1) (on b1 b2) (on-table b2))
+    (:goal (on b2 b1))
+)"""
+
+
+def test_unique_negatives_are_distinct():
+    problem = parse_problem(SMALL_PROBLEM)
+    negatives = get_manipulated_problems(problem, 20, 2, np.random.default_rng(0), unique=True)
+
+    texts = [canonical_problem_str(parse_problem(text)) for text in negatives.get_texts()]
+    assert len(texts) == 20
+    assert len(set(texts)) == 20
+    assert canonical_problem_str(problem) not in texts
+    assert negatives.draw_stats["filled"] == 0
+
+
+def test_unique_negatives_fill_up_small_problem():
+    problem = parse_problem(SMALL_PROBLEM)
+    with pytest.warns(UserWarning, match="distinct negatives"):
+        negatives = get_manipulated_problems(problem, 1000, 2, np.random.default_rng(0), unique=True)
+
+    texts = [canonical_problem_str(parse_problem(text)) for text in negatives.get_texts()]
+    num_distinct = len(set(texts))
+    assert len(negatives) == 1000
+    assert num_distinct < 1000
+    assert negatives.draw_stats["filled"] == 1000 - num_distinct
+    assert canonical_problem_str(problem) not in texts
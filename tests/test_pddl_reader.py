@@ -0,0 +1,87 @@
+import glob
+import os
+
+import pytest
+from pddl.parser.problem import ProblemParser
+
+from Sem2Plan.utils.pddl_reader import UnsupportedSyntax, fast_read_problem, read_problem
+
+RAW_DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "01_raw_dataset")
+RAW_PROBLEM_PATHS = sorted(glob.glob(os.path.join(RAW_DATASET_DIR, "*", "*", "problems", "*", "positive.pddl")))
+
+# texts outside the fast reader's subset, all read by `ProblemParser`
+PARSER_ONLY_PROBLEMS = {
+    "numeric init": "(define (problem p) (:domain d) (:objects a - t) (:init (f a) (= (cost a) 1)) (:goal (f a)))",
+    "metric expression": "(define (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (f a))"
+                         " (:metric minimize (+ (total-cost) 1)))",
+}
+# texts outside the subset that `ProblemParser` rejects as well
+INVALID_PROBLEMS = {
+    "either type": "(define (problem p) (:domain d) (:objects a - (either t1 t2)) (:init (f a)) (:goal (f a)))",
+    "quantified goal": "(define (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (forall (?x - t) (f ?x))))",
+    "unbalanced parentheses": "(define (problem p) (:domain d) (:objects a - t) (:init (f a)) (:goal (f a))",
+}
+
+
+def get_contents(problem) -> tuple:
+    """Everything `ProblemParser` reads into a problem; `Constant` equality ignores the types, so they are listed."""
+    return (
+        problem.name,
+        problem.domain_name,
+        problem.requirements,
+        sorted((o.name, sorted(o.type_tags)) for o in problem.objects),
+        set(problem.init),
+        problem.goal,
+        problem.metric,
+    )
+
+
+class CountingParser:
+    def __init__(self):
+        self.parser = ProblemParser()
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.parser(text)
+
+
+@pytest.fixture(scope="module")
+def problem_parser():
+    return ProblemParser()
+
+
+@pytest.mark.skipif(not RAW_PROBLEM_PATHS, reason="no raw dataset")
+@pytest.mark.parametrize("path", RAW_PROBLEM_PATHS, ids=lambda path: os.path.relpath(path, RAW_DATASET_DIR))
+def test_fast_reader_matches_parser(path, problem_parser):
+    with open(path) as f:
+        text = f.read()
+
+    expected, problem = problem_parser(text), fast_read_problem(text)
+    assert get_contents(problem) == get_contents(expected)
+    assert str(problem) == str(expected)
+
+
+@pytest.mark.parametrize("name", PARSER_ONLY_PROBLEMS)
+def test_unsupported_syntax_falls_back_to_parser(name, problem_parser):
+    text = PARSER_ONLY_PROBLEMS[name]
+    with pytest.raises(UnsupportedSyntax):
+        fast_read_problem(text)
+
+    parser = CountingParser()
+    problem = read_problem(text, lambda: parser)
+    assert parser.calls == 1
+    assert str(problem) == str(problem_parser(text))
+
+
+@pytest.mark.parametrize("name", INVALID_PROBLEMS)
+def test_invalid_problem_raises_parser_error(name):
+    text = INVALID_PROBLEMS[name]
+    with pytest.raises(UnsupportedSyntax):
+        fast_read_problem(text)
+
+    parser = CountingParser()
+    with pytest.raises(Exception) as error:
+        read_problem(text, lambda: parser)
+    assert parser.calls == 1
+    assert not isinstance(error.value, UnsupportedSyntax)
@@ -0,0 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+from Sem2Plan.utils.problem_cache import get_problem_parser
+
+
+def test_problem_parser_per_thread():
+    parser = get_problem_parser()
+    assert get_problem_parser() is parser
+
+    with ThreadPoolExecutor(1) as executor:
+        other_parser = executor.submit(get_problem_parser).result()
+    assert other_parser is not parser
@@ -0,0 +1,43 @@
+import os
+from Sem2Plan.utils.problem_store import PackedProblemStore, POSITIVE_FILE_NAME
+
+
+def write_problems(dataset_dir, problems: dict):
+    with PackedProblemStore(dataset_dir) as store:
+        for problem_id, content in problems.items():
+            store.write(problem_id, POSITIVE_FILE_NAME, content)
+
+
+def test_reader_leaves_cut_index_line(tmp_path):
+    write_problems(tmp_path, {"p00": "zero", "p01": "one"})
+    index_path = os.path.join(tmp_path, "shards", "index.jsonl")
+    with open(index_path, "a") as f:
+        f.write('{"id": "p02", "fi')  # cut record, e.g. a writer still appending
+    with open(index_path, "rb") as f:
+        index_bytes = f.read()
+
+    with PackedProblemStore(tmp_path) as store:
+        assert store.problem_ids() == ["p00", "p01"]
+        assert store.read("p01", POSITIVE_FILE_NAME) == "one"
+
+    with open(index_path, "rb") as f:
+        assert f.read() == index_bytes
+
+
+def test_writer_drops_cut_index_line(tmp_path):
+    write_problems(tmp_path, {"p00": "zero"})
+    with open(os.path.join(tmp_path, "shards", "index.jsonl"), "a") as f:
+        f.write('{"id": "p01", "fi')
+
+    write_problems(tmp_path, {"p01": "one"})
+
+    with PackedProblemStore(tmp_path) as store:
+        assert store.problem_ids() == ["p00", "p01"]
+        assert store.read("p01", POSITIVE_FILE_NAME) == "one"
+
+
+def test_opening_does_not_create_directories(tmp_path):
+    dataset_dir = os.path.join(tmp_path, "missing")
+    with PackedProblemStore(dataset_dir) as store:
+        assert store.problem_ids() == []
+    assert not os.path.exists(dataset_dir)